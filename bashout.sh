@@ -64,6 +64,23 @@ SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd -P)"
 # Construct paths relative to the script's directory
 RESOURCE_DIR="$SCRIPT_DIR/resources"
 
+# Use the Python engine for word counts, the last sentence and quotes when
+# it is available: it keeps a running count next to the save file instead
+# of rescanning the whole manuscript after every line, and picks quotes
+# through a line-offset index instead of shuffling the whole file.
+ENGINE="$SCRIPT_DIR/bashout_engine.py"
+if command -v python3 >/dev/null 2>&1 && [[ -f "$ENGINE" ]]; then
+    USE_ENGINE=1
+fi
+
+# With python3 available, hand over to the curses front-end, which runs the
+# same loop in-process without forking for every line. Set BASHOUT_CLASSIC=1
+# to keep using the pure Bash loop below.
+TUI="$SCRIPT_DIR/bashout_tui.py"
+if [[ -n "$USE_ENGINE" && -f "$TUI" && -z "$BASHOUT_CLASSIC" ]]; then
+    exec python3 "$TUI" "$@"
+fi
+
 # Create work directory and output file if they don't exist
 mkdir -p "$(dirname "$SAVE_FILE")" || { echo "Error: Cannot create directory for $SAVE_FILE"; exit 1; } # Create parent dir
 touch "$SAVE_FILE" || { echo "Error: Cannot create $SAVE_FILE"; exit 1; }
@@ -116,24 +133,55 @@ case $choice in
 esac
 
 # Ensure banner_file is not empty before trying to read from it
-if [[ -s "$banner_file" ]]; then
+if [[ "$choice" == 1 && -n "$USE_ENGINE" ]]; then
+  BANNER=$(python3 "$ENGINE" quote)
+elif [[ -s "$banner_file" ]]; then
   BANNER=$(sort -R "$banner_file" | head -n 1)
 else
   BANNER="No banner available."  # Or handle the empty file case differently
 fi
 
-# Initialize word counts (AFTER creating the file)
-STARTING_WORD_COUNT=$(wc -w "$SAVE_FILE" | cut -f1 -d ' ')
-SESSION_WORD_COUNT=0
-TOTAL_WORD_COUNT=$STARTING_WORD_COUNT
+# Print the last non-blank line of the save file. Only the end of the file
+# is read: the window of trailing lines doubles until a non-blank line is
+# found or the whole file has been covered.
+last_sentence() {
+    local lines=16 chunk line newlines
+    while true; do
+        # The trailing '.' keeps $(...) from dropping trailing blank lines
+        chunk=$(tail -n "$lines" "$SAVE_FILE"; echo .)
+        chunk=${chunk%.}
+        line=$(printf '%s' "$chunk" | grep -v '^[[:space:]]*$' | tail -n 1)
+        newlines=${chunk//[^$'\n']/}
+        if [[ -n "$line" || ${#newlines} -lt $((lines - 1)) ]]; then
+            printf '%s\n' "$line"
+            return
+        fi
+        lines=$((lines * 2))
+    done
+}
 
-# Function to update word counts
-update_word_counts() {
-    SENTENCE_WORD_COUNT=$(echo "$1" | wc -w)
-    TOTAL_WORD_COUNT=$(wc -w "$SAVE_FILE" | cut -f1 -d ' ')
-    SESSION_WORD_COUNT=$((TOTAL_WORD_COUNT - STARTING_WORD_COUNT))
+# Count words the way bashout_engine.py does: runs of bytes other than ASCII
+# whitespace. (wc -w depends on the locale and, in the C locale, skips words
+# made only of non-ASCII letters.)
+count_words() {
+    LC_ALL=C tr '\t\v\f\r' '    ' < "$SAVE_FILE" | LC_ALL=C awk '{ n += NF } END { print n + 0 }'
 }
 
+# Function to refresh the total word count and last sentence
+update_status() {
+    if [[ -n "$USE_ENGINE" ]]; then
+        { read -r TOTAL_WORD_COUNT; IFS= read -r LAST_SENTENCE; } < <(python3 "$ENGINE" status "$SAVE_FILE")
+    else
+        TOTAL_WORD_COUNT=$(count_words)
+        LAST_SENTENCE=$(last_sentence)
+    fi
+}
+
+# Initialize word counts (AFTER creating the file)
+update_status
+STARTING_WORD_COUNT=$TOTAL_WORD_COUNT
+SESSION_WORD_COUNT=0
+
 trap 'exit' INT  # Terminate the script with Ctrl-C
 
 while true; do
@@ -146,8 +194,7 @@ while true; do
 
 
     # Display the last sentence from the save file (if it's not empty)
-    if [[ -s "$SAVE_FILE" ]]; then
-        LAST_SENTENCE=$(tail -n 1 "$SAVE_FILE")
+    if [[ -n "$LAST_SENTENCE" ]]; then
         echo "$LAST_SENTENCE"
     fi
 
@@ -156,5 +203,6 @@ while true; do
     # Append new sentence (or blank line) to the save file
 	echo "$NEW_SENTENCE" >> "$SAVE_FILE"
 
-    update_word_counts "$NEW_SENTENCE"
+    update_status
+    SESSION_WORD_COUNT=$((TOTAL_WORD_COUNT - STARTING_WORD_COUNT))
 done
@@ -0,0 +1,274 @@
+"""Banner providers and the worker pool that runs them.
+
+A banner provider produces the text above the input field: a quote, the
+note, a style prompt, or a random line from a file of your own. Providers
+may touch the disk, so BannerService runs them on a small thread pool and
+hands results to a callback; each provider keeps a few banners prefetched
+so most requests are answered straight from memory.
+
+Files written as a side effect (note.txt, style.txt) go through a
+CoalescingWriter: a background thread that only writes the latest text
+for each file, however often it changes.
+"""
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bashout_engine import (RESOURCE_DIR, LineOffsetIndex, QuoteCorpus, make_style_prompt,
+                            quote_files, read_bashoutrc)
+
+BANNER_WORKERS = 2
+
+class CoalescingWriter:
+    """Writes small text files from a background thread.
+
+    write() only records the text; if a file is written again before the
+    thread gets to it, only the latest text is written. Files are replaced
+    atomically, and `on_written(mtime_ns)` is called once the text is saved.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._writing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='bashout-banner-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, path, text, on_written=None):
+        with self._cond:
+            self._pending[Path(path)] = (text, on_written)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until everything written so far is on disk."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._writing = True
+            for path, (text, on_written) in batch.items():
+                tmp = path.with_name(f".{path.name}.tmp")
+                try:
+                    with open(tmp, 'w', encoding='utf-8') as f:
+                        f.write(text)
+                    tmp.replace(path)
+                    if on_written:
+                        on_written(path.stat().st_mtime_ns)
+                except OSError:
+                    # Banner files are a convenience; the next write tries again
+                    pass
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+class BannerProvider:
+    """Base class for banner providers.
+
+    `fetch()` returns a banner and is only ever called on a worker thread.
+    `shown(text)` is called when a banner is handed out, for providers
+    that record what was shown. Up to `prefetch` banners are kept ready.
+    """
+
+    name = None
+    prefetch = 4
+
+    def fetch(self):
+        raise NotImplementedError
+
+    def shown(self, text):
+        pass
+
+class QuoteProvider(BannerProvider):
+    """Random quotes from the quote corpus (QUOTES_FILES)."""
+
+    name = 'Quote'
+    prefetch = 8
+
+    def __init__(self, corpus=None):
+        self.corpus = corpus or QuoteCorpus(quote_files())
+
+    def fetch(self):
+        return self.corpus.random_quote()
+
+class NoteProvider(BannerProvider):
+    """The note in resources/note.txt, re-read only when it changes."""
+
+    name = 'Note'
+    # Always fetched fresh, so edits made elsewhere show up
+    prefetch = 0
+    NO_NOTE = "No note available."
+
+    def __init__(self, writer, resource_dir=RESOURCE_DIR):
+        self.writer = writer
+        self.path = Path(resource_dir) / 'note.txt'
+        # (mtime_ns of note.txt, note); mtime is None while a new note is being saved
+        self._cached = (0, self.NO_NOTE)
+        self._lock = threading.Lock()
+
+    def fetch(self):
+        with self._lock:
+            mtime_ns, note = self._cached
+            if mtime_ns is None:
+                return note
+            try:
+                current = self.path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return self.NO_NOTE
+            if current != mtime_ns:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    note = f.read().strip() or self.NO_NOTE
+                self._cached = (current, note)
+            return note
+
+    @property
+    def last_known(self):
+        """The note as last read or set, without touching the disk."""
+        note = self._cached[1]
+        return '' if note == self.NO_NOTE else note
+
+    def set_note(self, text):
+        """Change the note; it is saved to note.txt in the background."""
+        note = text.strip() or self.NO_NOTE
+        with self._lock:
+            self._cached = (None, note)
+
+        def written(mtime_ns):
+            with self._lock:
+                if self._cached == (None, note):
+                    self._cached = (mtime_ns, note)
+
+        self.writer.write(self.path, text.strip() + '\n', written)
+
+class StylePromptProvider(BannerProvider):
+    """Random style prompts; the one shown is saved to resources/style.txt."""
+
+    name = 'Prompt'
+
+    def __init__(self, writer, resource_dir=RESOURCE_DIR, rng=random):
+        self.writer = writer
+        self.path = Path(resource_dir) / 'style.txt'
+        self.rng = rng
+
+    def fetch(self):
+        return make_style_prompt(self.rng)
+
+    def shown(self, text):
+        self.writer.write(self.path, text)
+
+class FileProvider(BannerProvider):
+    """Random non-blank lines from a file of your own, named after the file."""
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+        self.name = self.path.stem.replace('_', ' ').replace('-', ' ').title()
+
+    def fetch(self):
+        index = LineOffsetIndex.cached(self.path)
+        if not len(index):
+            return f"No lines in {self.path.name}."
+        return index.read_line(random.randrange(len(index)))
+
+def default_providers(writer, resource_dir=RESOURCE_DIR, config=None):
+    """The built-in providers plus one per file in BANNER_FILES."""
+    config = read_bashoutrc() if config is None else config
+    providers = [QuoteProvider(), NoteProvider(writer, resource_dir),
+                 StylePromptProvider(writer, resource_dir)]
+    names = {p.name for p in providers}
+    for path in config.get('BANNER_FILES', '').split(','):
+        if path.strip():
+            provider = FileProvider(path.strip())
+            if provider.name not in names:
+                names.add(provider.name)
+                providers.append(provider)
+    return providers
+
+class BannerService:
+    """Runs banner providers on a thread pool, with prefetching.
+
+    request(name, callback) calls `callback(text)` with a banner from the
+    named provider: right away if one is prefetched, otherwise from a
+    worker thread once it has been fetched. Callers that need results on
+    a particular thread (such as Qt's GUI thread) should post them there.
+    """
+
+    def __init__(self, providers, workers=BANNER_WORKERS):
+        self.providers = {p.name: p for p in providers}
+        self._ready = {name: deque() for name in self.providers}
+        self._in_flight = dict.fromkeys(self.providers, 0)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bashout-banner')
+
+    @property
+    def names(self):
+        return list(self.providers)
+
+    def request(self, name, callback):
+        provider = self.providers[name]
+        with self._lock:
+            ready = self._ready[name]
+            text = ready.popleft() if ready else None
+        if text is None:
+            self._submit(self._deliver, provider, callback)
+        else:
+            provider.shown(text)
+            callback(text)
+        self._refill(provider)
+
+    def invalidate(self, name):
+        """Drop prefetched banners, e.g. after their source changed."""
+        with self._lock:
+            self._ready[name].clear()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, provider):
+        try:
+            return provider.fetch()
+        except (OSError, ValueError) as e:
+            return f"Banner unavailable: {e}"
+
+    def _deliver(self, provider, callback):
+        text = self._fetch(provider)
+        provider.shown(text)
+        callback(text)
+
+    def _refill(self, provider):
+        with self._lock:
+            wanted = provider.prefetch - len(self._ready[provider.name]) - self._in_flight[provider.name]
+            self._in_flight[provider.name] += max(wanted, 0)
+        for _ in range(max(wanted, 0)):
+            self._submit(self._prefetch_one, provider)
+
+    def _prefetch_one(self, provider):
+        text = self._fetch(provider)
+        with self._lock:
+            self._in_flight[provider.name] -= 1
+            self._ready[provider.name].append(text)
+
+    def _submit(self, fn, *args):
+        if self._closed:
+            return
+        try:
+            self._pool.submit(fn, *args)
+        except RuntimeError:
+            # Shut down while we were submitting
+            pass
@@ -0,0 +1,1414 @@
+"""Headless BashOut engine shared by the GUI and the terminal script.
+
+Everything here works without PyQt5: configuration, word counting, the
+last-sentence reader, the background manuscript writer and banner text.
+Run it directly for a small command line interface used by bashout.sh:
+
+    python3 bashout_engine.py count FILE
+    python3 bashout_engine.py last-line FILE
+    python3 bashout_engine.py status FILE
+    python3 bashout_engine.py segment FILE
+    python3 bashout_engine.py cat FILE
+"""
+import sys
+import os
+import gzip
+import io
+import queue
+import random
+import shutil
+import sqlite3
+from array import array
+import json
+import struct
+import threading
+import time
+from pathlib import Path
+
+# Constants
+CONFIG_FILE = Path.home() / '.bashout_config.json'
+DEFAULT_SAVE_DIR = Path.home() / 'Documents' / 'BashOut'
+BASHOUTRC = Path.home() / '.bashoutrc'
+RESOURCE_DIR = Path(__file__).resolve().parent / 'resources'
+
+_bashoutrc_cache = {}
+
+def read_bashoutrc(path=BASHOUTRC):
+    """Read ~/.bashoutrc key:value pairs (keys upper-cased).
+
+    The parsed values are cached until the file's mtime changes.
+    """
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    cached = _bashoutrc_cache.get(path)
+    if cached and cached[0] == mtime_ns:
+        return dict(cached[1])
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or ':' not in line:
+                continue
+            key, value = line.split(':', 1)
+            values[key.strip().upper()] = value.strip()
+    _bashoutrc_cache[path] = (mtime_ns, values)
+    return dict(values)
+
+def default_save_dir():
+    """The GUI's save location."""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return Path(json.load(f).get('save_dir', str(DEFAULT_SAVE_DIR)))
+    except (OSError, ValueError):
+        return DEFAULT_SAVE_DIR
+
+READ_CHUNK_SIZE = 1 << 20
+TAIL_BLOCK_SIZE = 8192
+FINGERPRINT_SIZE = 64
+
+# What counts as a word, for every front-end: a maximal run of bytes other
+# than ASCII whitespace (space, tab, newline, vertical tab, form feed,
+# carriage return). Multi-byte UTF-8 characters are never whitespace, so a
+# no-break space joins words instead of separating them. This is
+# len(data.split()) on bytes, and what bashout.sh counts without python3.
+WHITESPACE_BYTES = b' \t\n\x0b\x0c\r'
+# Maps whitespace bytes to b' ' and everything else to b'w', so the words
+# in a chunk are the b' w' boundaries (plus a word starting the chunk)
+_WORD_CLASSES = bytes(0x20 if b in WHITESPACE_BYTES else 0x77 for b in range(256))
+
+def count_words_in_bytes(data, in_word=False):
+    """Count words (see WHITESPACE_BYTES) in a bytes-like object.
+
+    Works in two C-level passes over the buffer, never building tokens.
+    `in_word` says whether the bytes before `data` ended in the middle of
+    a word, so a word continuing across the boundary is not counted twice.
+    Returns (word_count, in_word) for the end of `data`.
+    """
+    if not data:
+        return 0, in_word
+    classes = data.translate(_WORD_CLASSES)
+    words = classes.count(b' w')
+    if classes[0] == 0x77 and not in_word:
+        words += 1
+    return words, classes[-1] == 0x77
+
+def count_words_in_chunks(chunks, in_word=False):
+    """Count words in an iterable of byte chunks.
+
+    See count_words_in_bytes() for `in_word` and the return value.
+    """
+    words = 0
+    for chunk in chunks:
+        n, in_word = count_words_in_bytes(chunk, in_word)
+        words += n
+    return words, in_word
+
+def count_words_in_stream(f, in_word=False):
+    """Count words in a binary stream, reading it in fixed-size chunks.
+
+    See count_words_in_chunks() for `in_word` and the return value.
+    """
+    return count_words_in_chunks(iter(lambda: f.read(READ_CHUNK_SIZE), b''), in_word)
+
+def count_words(file_path):
+    """Count the words in a file without loading it all into memory."""
+    try:
+        with open(file_path, 'rb') as f:
+            return count_words_in_stream(f)[0]
+    except OSError:
+        return 0
+
+def read_last_line(file_path, block_size=TAIL_BLOCK_SIZE):
+    """Return the last non-blank line of a file, stripped.
+
+    Reads backwards from EOF one block at a time, so the cost depends on
+    the length of the trailing lines rather than the size of the file.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            partial = b''
+            while end > 0:
+                start = max(0, end - block_size)
+                f.seek(start)
+                lines = (f.read(end - start) + partial).split(b'\n')
+                end = start
+                # Unless we reached the start of the file, the first piece
+                # may be the tail of a longer line; keep it for the next block.
+                partial = lines.pop(0) if start > 0 else b''
+                for line in reversed(lines):
+                    text = line.decode('utf-8', errors='replace').strip()
+                    if text:
+                        return text
+    except OSError:
+        pass
+    return ''
+
+class WordCountIndex:
+    """Running word count for a manuscript, persisted in a sidecar file.
+
+    The sidecar (`.<name>.txt.wc.json` next to the manuscript) records the
+    total alongside the file size, mtime and a fingerprint of the last
+    bytes counted. Opening a manuscript whose sidecar still matches is O(1);
+    if the file only grew, just the appended bytes are scanned, and any
+    other change falls back to a full streaming count. Sidecars from an
+    older VERSION (which counted words differently) are recounted.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.words = 0
+        self.size = 0
+        self.mtime_ns = 0
+        self.in_word = False
+        self.fingerprint = ''
+
+    @property
+    def sidecar(self):
+        return self.path.with_name(f".{self.path.name}.wc.json")
+
+    def refresh(self):
+        """Bring the count up to date with the file on disk and return it."""
+        self._load_sidecar()
+        try:
+            st = self.path.stat()
+        except OSError:
+            self._reset()
+            return self.words
+        if st.st_size == self.size and st.st_mtime_ns == self.mtime_ns:
+            return self.words
+        with open(self.path, 'rb') as f:
+            if st.st_size >= self.size and self._fingerprint_matches(f):
+                f.seek(self.size)
+            else:
+                self._reset()
+                f.seek(0)
+            words, self.in_word = count_words_in_stream(f, self.in_word)
+            self.words += words
+            self._update_position(f, f.tell())
+        self.mtime_ns = st.st_mtime_ns
+        self.save()
+        return self.words
+
+    def add_text(self, text):
+        """Account for `text` having just been appended to the manuscript."""
+        encoded = text.encode('utf-8')
+        words, self.in_word = count_words_in_bytes(encoded, self.in_word)
+        self.words += words
+        self.fingerprint = (self._fingerprint_bytes() + encoded)[-FINGERPRINT_SIZE:].hex()
+        self.size += len(encoded)
+        return self.words
+
+    def rename(self, new_path):
+        """Move the sidecar along with its renamed manuscript."""
+        old_sidecar = self.sidecar
+        self.path = Path(new_path)
+        try:
+            old_sidecar.replace(self.sidecar)
+        except OSError:
+            self.save()
+
+    def state(self):
+        """Snapshot of the index as stored in the sidecar."""
+        return {
+            'version': self.VERSION,
+            'words': self.words,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'in_word': self.in_word,
+            'fingerprint': self.fingerprint,
+        }
+
+    def save(self, state=None):
+        """Write the sidecar, from `state` if given or else the current index."""
+        try:
+            tmp = self.sidecar.with_name(self.sidecar.name + '.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(state or self.state(), f)
+            tmp.replace(self.sidecar)
+        except OSError:
+            pass
+
+    def _load_sidecar(self):
+        try:
+            with open(self.sidecar, 'r') as f:
+                state = json.load(f)
+            if state.get('version') != self.VERSION:
+                raise ValueError("old sidecar")
+            self.words = int(state['words'])
+            self.size = int(state['size'])
+            self.mtime_ns = int(state['mtime_ns'])
+            self.in_word = bool(state['in_word'])
+            self.fingerprint = str(state['fingerprint'])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._reset()
+
+    def _reset(self):
+        self.words = 0
+        self.size = 0
+        self.mtime_ns = 0
+        self.in_word = False
+        self.fingerprint = ''
+
+    def _fingerprint_bytes(self):
+        return bytes.fromhex(self.fingerprint)
+
+    def _fingerprint_matches(self, f):
+        expected = self._fingerprint_bytes()
+        f.seek(self.size - len(expected))
+        return f.read(len(expected)) == expected
+
+    def _update_position(self, f, size):
+        start = max(0, size - FINGERPRINT_SIZE)
+        f.seek(start)
+        self.fingerprint = f.read(size - start).hex()
+        self.size = size
+
+FSYNC_POLICIES = ('line', 'interval', 'idle')
+WRITE_RETRY_DELAY = 1.0
+
+class ManuscriptWriter:
+    """Appends text to a manuscript from a dedicated writer thread.
+
+    append() only queues the text and returns a sequence number, so the
+    caller never waits on the disk. The writer keeps the file open, writes
+    everything queued since its last pass in one go and group-commits it
+    with a single fsync according to `fsync_policy`:
+
+    - 'line': after every batch of appends
+    - 'interval': at most every `fsync_interval` seconds
+    - 'idle': once no new text has arrived for `fsync_interval` seconds
+
+    `durable` is the sequence number of the last append known to be on
+    disk; `on_durable(seq)` and `on_error(exc)` are called from the writer
+    thread. `written_size` is the size the file should have after the
+    writes made so far, so other programs' appends can be told apart.
+
+    If an `index` (WordCountIndex) is given, append() keeps it up to date
+    and its sidecar is written after each commit, so it never describes
+    data that isn't on disk. A `metrics` object (see
+    bashout_metrics.SessionMetrics) gets 'disk write' and 'fsync' timings.
+    """
+
+    _SYNC = object()
+    _CLOSE = object()
+    _ROLL = object()
+
+    def __init__(self, path, fsync_policy='interval', fsync_interval=0.5,
+                 index=None, on_durable=None, on_error=None, metrics=None):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.path = Path(path)
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.index = index
+        self.on_durable = on_durable
+        self.on_error = on_error
+        self.metrics = metrics
+        self.submitted = 0
+        self.durable = 0
+        self.error = None
+        self.written_size = index.size if index else None
+        self._closed = False
+        self._close_requested = False
+        self._queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='bashout-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, text):
+        """Queue `text` for appending and return its sequence number."""
+        self.submitted += 1
+        state = None
+        if self.index:
+            self.index.add_text(text)
+            state = self.index.state()
+        self._queue.put((self.submitted, text.encode('utf-8'), state))
+        return self.submitted
+
+    def flush(self, timeout=None):
+        """Commit everything appended so far; True once it is durable."""
+        target = self.submitted
+        self._queue.put(self._SYNC)
+        with self._cond:
+            self._cond.wait_for(lambda: self.durable >= target or self._closed, timeout)
+            return self.durable >= target
+
+    def roll_over(self, callback):
+        """Call `callback` on the writer thread once everything appended so far is on disk.
+
+        The file is closed first, so `callback` may move it; later appends go
+        to a fresh file at `path`. Their sequence numbers only become durable
+        after `callback` succeeded; if it raises, it is retried.
+        """
+        self._queue.put((self._ROLL, callback))
+
+    def close(self, timeout=None):
+        """Commit outstanding appends and stop the writer thread."""
+        self._close_requested = True
+        self._queue.put(self._CLOSE)
+        self._thread.join(timeout)
+
+    def _run(self):
+        f = None
+        buffered = []        # written to the OS but not yet fsynced: (seq, data, state)
+        unwritten = []       # failed writes to retry: (seq, data, state)
+        pending_start = None # file size before the first buffered write
+        rewrite_from = None  # size to truncate back to before retrying
+        roll = None          # roll_over() callback waiting for the text before it
+        rolled_seq = None    # last append before it, reported once it has run
+        last_sync = time.monotonic()
+        closing = False
+        while True:
+            # Appends queued after a pending roll-over belong in the next file
+            item = None if roll else self._next_item(buffered or unwritten, last_sync)
+            batch = list(unwritten)
+            force_sync = roll is not None
+            while item is not None:
+                if item is self._CLOSE:
+                    closing = force_sync = True
+                elif item is self._SYNC:
+                    force_sync = True
+                elif item[0] is self._ROLL:
+                    roll = item[1]
+                    force_sync = True
+                    break
+                else:
+                    batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            idle = not batch and not force_sync
+            unwritten = []
+
+            try:
+                if batch:
+                    if f is None:
+                        f = open(self.path, 'ab')
+                        if rewrite_from is not None:
+                            # Whatever part of the failed writes reached the file
+                            # is written again below, so drop it
+                            if os.fstat(f.fileno()).st_size > rewrite_from:
+                                f.truncate(rewrite_from)
+                            rewrite_from = None
+                    if pending_start is None:
+                        pending_start = os.fstat(f.fileno()).st_size
+                    started = time.perf_counter()
+                    payload = b''.join(data for _, data, _ in batch)
+                    buffered.extend(batch)
+                    batch = []
+                    f.write(payload)
+                    f.flush()
+                    self._record('disk write', started)
+                    if buffered[-1][2]:
+                        self.written_size = buffered[-1][2]['size']
+                if buffered and self._should_sync(force_sync, idle, last_sync):
+                    started = time.perf_counter()
+                    os.fsync(f.fileno())
+                    self._record('fsync', started)
+                    last_sync = time.monotonic()
+                    seq, _, state = buffered[-1]
+                    buffered = []
+                    pending_start = None
+                    if roll:
+                        rolled_seq = seq
+                    else:
+                        self._committed(seq, state)
+                if roll and not buffered:
+                    if f is not None:
+                        f.close()
+                        f = None
+                    roll()
+                    roll = None
+                    if self.index:
+                        self.written_size = 0
+                    if rolled_seq is not None:
+                        # Its index state describes the old file, so isn't saved
+                        self._committed(rolled_seq, None)
+                        rolled_seq = None
+            except Exception as e:
+                # Keep everything not yet fsynced and write it again on a fresh
+                # handle: after a failed fsync the kernel may have dropped the
+                # dirty pages, so the earlier writes can't be trusted. Anything
+                # unexpected is reported the same way rather than stopping the
+                # writer, which would lose every later append.
+                unwritten = buffered + batch
+                buffered = []
+                if pending_start is not None:
+                    rewrite_from = pending_start
+                    pending_start = None
+                self.error = e
+                if self.on_error:
+                    self.on_error(e)
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+                    f = None
+                # A roll-over that keeps failing mustn't hold up close()
+                if closing or (roll and self._close_requested):
+                    break
+                time.sleep(WRITE_RETRY_DELAY)
+                continue
+
+            if closing:
+                break
+        if f is not None:
+            f.close()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _next_item(self, pending, last_sync):
+        """Wait for queued work, or until pending data is due for fsync."""
+        if not pending:
+            timeout = None
+        elif self.fsync_policy == 'interval':
+            timeout = max(0, last_sync + self.fsync_interval - time.monotonic())
+        else:
+            timeout = self.fsync_interval
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _should_sync(self, force_sync, idle, last_sync):
+        if force_sync or self.fsync_policy == 'line':
+            return True
+        if self.fsync_policy == 'interval':
+            return time.monotonic() - last_sync >= self.fsync_interval
+        return idle
+
+    def _record(self, stage, started):
+        if self.metrics:
+            self.metrics.record(stage, time.perf_counter() - started)
+
+    def _committed(self, seq, state):
+        if self.index and state:
+            try:
+                state['mtime_ns'] = self.path.stat().st_mtime_ns
+            except OSError:
+                pass
+            self.index.save(state)
+        self.error = None
+        self.durable = seq
+        if self.on_durable:
+            self.on_durable(seq)
+        with self._cond:
+            self._cond.notify_all()
+
+
+DEFAULT_SEGMENT_SIZE = 4 << 20
+SEGMENT_SUFFIX = '.bashout'
+
+def _split_last_line(data):
+    """Last non-blank line of a bytes buffer, stripped."""
+    for line in reversed(data.split(b'\n')):
+        text = line.decode('utf-8', errors='replace').strip()
+        if text:
+            return text
+    return ''
+
+class SegmentedManuscript:
+    """A manuscript stored as a directory of segments plus a manifest.
+
+    New text is appended to `active.txt`, which stays plain text. Once it
+    grows past `segment_size` it is sealed: renamed to the next numbered
+    segment and, if `compress` is set, gzipped on a background thread.
+    `manifest.json` records each sealed segment's bytes, words, lines and
+    last line, so totals and the last sentence never touch cold segments.
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(self, directory, segment_size=DEFAULT_SEGMENT_SIZE, compress=True):
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.compress = compress
+        self.segments = []
+        self._lock = threading.Lock()
+        self._compressors = []
+        self._reserved = []  # entries from reserve() not sealed yet
+
+    @property
+    def manifest_path(self):
+        return self.directory / 'manifest.json'
+
+    @property
+    def active_path(self):
+        return self.directory / 'active.txt'
+
+    @property
+    def sealed_words(self):
+        return sum(segment['words'] for segment in self.segments)
+
+    @property
+    def sealed_lines(self):
+        return sum(segment['lines'] for segment in self.segments)
+
+    @property
+    def sealed_last_line(self):
+        for segment in reversed(self.segments):
+            if segment['last_line']:
+                return segment['last_line']
+        return ''
+
+    def load(self, create=True):
+        """Read the manifest, creating an empty manuscript if there is none.
+
+        With `create=False` nothing is written: a missing manifest or active
+        segment just means no text there yet. A corrupt manifest raises
+        ValueError or KeyError.
+        """
+        if create:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            self.segment_size = manifest.get('segment_size', self.segment_size)
+            self.compress = manifest.get('compress', self.compress)
+            self.segments = manifest['segments']
+        elif create:
+            self.save_manifest()
+        if create:
+            self.active_path.touch(exist_ok=True)
+        return self
+
+    def save_manifest(self):
+        manifest = {
+            'version': self.MANIFEST_VERSION,
+            'segment_size': self.segment_size,
+            'compress': self.compress,
+            'segments': [s for s in self.segments if not self._is_reserved(s)],
+        }
+        tmp = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.manifest_path)
+
+    def reserve(self, words, size, last_line=''):
+        """Count the active segment as sealed now, ahead of seal_active().
+
+        Totals include the returned entry straight away, but it is only
+        written to the manifest once seal_active(words, entry) has moved the
+        file, so that can happen on another thread.
+        """
+        with self._lock:
+            entry = {
+                'file': f"{len(self.segments) + 1:06d}.txt",
+                'bytes': size,
+                'words': words,
+                'lines': 0,
+                'last_line': last_line,
+            }
+            self.segments.append(entry)
+            self._reserved.append(entry)
+        return entry
+
+    def seal_active(self, words, entry=None):
+        """Turn the active segment (holding `words` words) into a sealed one.
+
+        Pass the `entry` from reserve() if there was one. Safe to call again
+        after it failed part way.
+        """
+        target = self.directory / (entry['file'] if entry else f"{len(self.segments) + 1:06d}.txt")
+        source = target if entry and target.exists() else self.active_path
+        with open(source, 'rb') as f:
+            data = f.read()
+        if not data:
+            if entry:
+                with self._lock:
+                    self.segments = [s for s in self.segments if s is not entry]
+                    self._reserved = [s for s in self._reserved if s is not entry]
+            return
+        sealed = {
+            'bytes': len(data),
+            'words': words,
+            'lines': data.count(b'\n'),
+            'last_line': _split_last_line(data),
+        }
+        with self._lock:
+            if source != target:
+                self.active_path.rename(target)
+            if entry is None:
+                entry = {'file': target.name, **sealed}
+                self.segments.append(entry)
+            else:
+                entry.update(sealed)
+            self._reserved = [s for s in self._reserved if s is not entry]
+            self.save_manifest()
+            self.active_path.touch()
+        name = entry['file']
+        WordCountIndex(self.active_path).sidecar.unlink(missing_ok=True)
+        if self.compress:
+            thread = threading.Thread(target=self._compress, args=(name,),
+                                      name='bashout-compress', daemon=True)
+            self._compressors.append(thread)
+            thread.start()
+
+    def wait_for_compression(self):
+        for thread in self._compressors:
+            thread.join()
+        self._compressors = []
+
+    def iter_chunks(self, chunk_size=READ_CHUNK_SIZE, start=0):
+        """Yield the manuscript from byte `start`, oldest first, as plain-text bytes.
+
+        Sealed segments that end before `start` are skipped without being read.
+        """
+        with self._lock:
+            # A reserved segment's text is still in the active one
+            files = [(segment['file'], segment['bytes']) for segment in self.segments
+                     if not self._is_reserved(segment)]
+        position = 0
+        for name, size in files + [(self.active_path.name, None)]:
+            if size is not None and position + size <= start:
+                position += size
+                continue
+            path = self.directory / name
+            if size is None and not path.exists():
+                # Loaded with create=False before any text was written
+                break
+            if not path.exists() and (self.directory / (name + '.gz')).exists():
+                # Compressed since we read the manifest
+                name += '.gz'
+                path = self.directory / name
+            opener = gzip.open if name.endswith('.gz') else open
+            with opener(path, 'rb') as f:
+                if start > position:
+                    f.seek(start - position)
+                position += size or 0
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def _is_reserved(self, segment):
+        return any(segment is entry for entry in self._reserved)
+
+    def _compress(self, name):
+        source = self.directory / name
+        target = source.with_name(name + '.gz')
+        tmp = target.with_name(target.name + '.tmp')
+        try:
+            with open(source, 'rb') as f, gzip.open(tmp, 'wb') as out:
+                shutil.copyfileobj(f, out, READ_CHUNK_SIZE)
+            tmp.replace(target)
+            with self._lock:
+                for segment in self.segments:
+                    if segment['file'] == name:
+                        segment['file'] = target.name
+                self.save_manifest()
+            source.unlink()
+        except OSError:
+            # Leave the segment uncompressed; it is still listed in the manifest
+            tmp.unlink(missing_ok=True)
+
+    @classmethod
+    def convert(cls, txt_path, segment_size=DEFAULT_SEGMENT_SIZE, compress=True):
+        """Convert a plain `<name>.txt` manuscript into `<name>.bashout/` in place."""
+        txt_path = Path(txt_path)
+        directory = txt_path.with_suffix(SEGMENT_SUFFIX)
+        if directory.exists():
+            raise FileExistsError(f"{directory} already exists.")
+        tmp_dir = directory.with_name(directory.name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        manuscript = cls(tmp_dir, segment_size, compress).load()
+        with open(txt_path, 'rb') as f:
+            pending = b''
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                pending += chunk
+                # Seal at the first line break past the threshold
+                while len(pending) >= segment_size:
+                    cut = pending.find(b'\n', segment_size - 1)
+                    if cut < 0:
+                        break
+                    data, pending = pending[:cut + 1], pending[cut + 1:]
+                    with open(manuscript.active_path, 'wb') as out:
+                        out.write(data)
+                    words = count_words_in_stream(io.BytesIO(data))[0]
+                    manuscript.seal_active(words)
+                if not chunk:
+                    break
+        with open(manuscript.active_path, 'wb') as out:
+            out.write(pending)
+        manuscript.wait_for_compression()
+        tmp_dir.rename(directory)
+        txt_path.unlink()
+        WordCountIndex(txt_path).sidecar.unlink(missing_ok=True)
+        return cls(directory).load()
+
+def iter_manuscript_chunks(path, chunk_size=READ_CHUNK_SIZE, start=0):
+    """Yield a plain or segmented manuscript, from byte `start`, as plain-text bytes."""
+    path = Path(path)
+    if path.is_dir():
+        yield from SegmentedManuscript(path).load(create=False).iter_chunks(chunk_size, start)
+        return
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def manuscript_size(path):
+    """Plain-text size of a manuscript in bytes, without reading it."""
+    path = Path(path)
+    if path.is_dir():
+        segments = SegmentedManuscript(path).load(create=False)
+        return sum(s['bytes'] for s in segments.segments) + segments.active_path.stat().st_size
+    return path.stat().st_size
+
+CATALOG_FILE = '.bashout_catalog.sqlite3'
+
+def manuscript_name(entry):
+    """Manuscript name for a save_dir entry, or None if it isn't one."""
+    if entry.name.startswith('.'):
+        return None
+    if entry.name.endswith('.txt') and entry.is_file():
+        return entry.name[:-len('.txt')]
+    if entry.name.endswith(SEGMENT_SUFFIX) and entry.is_dir():
+        return entry.name[:-len(SEGMENT_SUFFIX)]
+    return None
+
+def valid_manuscript_name(name):
+    """Whether `name` can name a new manuscript.
+
+    manuscript_name() skips names starting with a dot, which are sidecars
+    (and `.all` the combined writing history), and a path separator would
+    put the file outside save_dir.
+    """
+    return bool(name) and not name.startswith('.') and not any(
+        sep in name for sep in ('/', os.sep, os.altsep, '\0') if sep)
+
+def describe_manuscript(save_dir, name):
+    """Catalog entry for one manuscript: size, words, mtime and last line."""
+    save_dir = Path(save_dir)
+    segment_dir = save_dir / f"{name}{SEGMENT_SUFFIX}"
+    if segment_dir.is_dir():
+        segments = SegmentedManuscript(segment_dir).load(create=False)
+        path = segments.active_path
+        sealed_bytes = sum(segment['bytes'] for segment in segments.segments)
+        sealed_words = segments.sealed_words
+        last_line = read_last_line(path) or segments.sealed_last_line
+    else:
+        path = save_dir / f"{name}.txt"
+        sealed_bytes = sealed_words = 0
+        last_line = read_last_line(path)
+    st = path.stat()
+    return {
+        'name': name,
+        'size': sealed_bytes + st.st_size,
+        'words': sealed_words + WordCountIndex(path).refresh(),
+        'mtime_ns': st.st_mtime_ns,
+        'last_line': last_line,
+    }
+
+class ManuscriptCatalog:
+    """SQLite catalog of the manuscripts in a save directory.
+
+    Stores each manuscript's size, word count, last-modified time and a
+    last-line preview in `.bashout_catalog.sqlite3`, so listing thousands
+    of manuscripts is one query. ManuscriptStore updates its own entry as
+    text is committed; everything else is reconciled lazily, when the
+    directory's mtime has changed. Sidecar writes change it too, so that
+    costs one stat per manuscript, and only manuscripts whose file (or
+    active segment) size or mtime changed are re-read. Safe to use from
+    several threads.
+    """
+
+    def __init__(self, save_dir):
+        self.save_dir = Path(save_dir)
+        self._local = threading.local()
+
+    @property
+    def path(self):
+        return self.save_dir / CATALOG_FILE
+
+    def list(self):
+        """All manuscripts, most recently modified first."""
+        self.reconcile()
+        rows = self._db().execute(
+            "SELECT name, size, words, mtime_ns, last_line FROM manuscripts "
+            "ORDER BY mtime_ns DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, name):
+        row = self._db().execute(
+            "SELECT name, size, words, mtime_ns, last_line FROM manuscripts WHERE name = ?",
+            (name,)).fetchone()
+        return dict(row) if row else None
+
+    def update(self, entry):
+        """Insert or replace one manuscript's entry."""
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO manuscripts (name, size, words, mtime_ns, last_line) "
+                "VALUES (:name, :size, :words, :mtime_ns, :last_line)", entry)
+
+    def rename(self, old_name, new_name):
+        with self._db() as db:
+            db.execute("UPDATE manuscripts SET name = ? WHERE name = ?", (new_name, old_name))
+
+    def reconcile(self, force=False):
+        """Bring the catalog in line with the directory if it has changed."""
+        try:
+            dir_mtime_ns = self.save_dir.stat().st_mtime_ns
+        except OSError:
+            return
+        db = self._db()
+        row = db.execute("SELECT value FROM meta WHERE key = 'dir_mtime_ns'").fetchone()
+        if not force and row and int(row['value']) == dir_mtime_ns:
+            return
+        known = {row['name']: (row['size'], row['mtime_ns'])
+                 for row in db.execute("SELECT name, size, mtime_ns FROM manuscripts")}
+        seen = set()
+        with os.scandir(self.save_dir) as entries:
+            for entry in entries:
+                name = manuscript_name(entry)
+                if name is None:
+                    continue
+                seen.add(name)
+                if name in known and self._unchanged(entry, *known[name]):
+                    continue
+                try:
+                    self.update(describe_manuscript(self.save_dir, name))
+                except (OSError, ValueError, KeyError):
+                    seen.discard(name)
+        with db:
+            db.executemany("DELETE FROM manuscripts WHERE name = ?",
+                           [(name,) for name in known if name not in seen])
+            # Stored from before the scan, so changes made during it are seen next time
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime_ns', ?)",
+                       (str(dir_mtime_ns),))
+
+    def _unchanged(self, entry, size, mtime_ns):
+        """True if a manuscript still has the size and mtime it was cataloged with."""
+        try:
+            if entry.is_dir():
+                # Sealed segments never change; the entry's mtime is the active segment's
+                st = os.stat(os.path.join(entry.path, 'active.txt'))
+                return st.st_mtime_ns == mtime_ns
+            st = entry.stat()
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns) == (size, mtime_ns)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            # It's a cache that can be rebuilt, so don't fsync every commit
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS manuscripts ("
+                       "name TEXT PRIMARY KEY, size INTEGER, words INTEGER, "
+                       "mtime_ns INTEGER, last_line TEXT)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            db.commit()
+            self._local.db = db
+        return db
+
+class ManuscriptStore:
+    """One manuscript on disk: its text file, word count index and writer.
+
+    `open()` prepares the file and loads the word count and last sentence;
+    `append()` hands a line to the background writer. `starting_words` is
+    the total when the manuscript was opened, for session counts.
+
+    If `<name>.bashout/` exists the manuscript is segmented (see
+    SegmentedManuscript): appends go to its active segment, which is
+    sealed once it grows past the segment size.
+
+    If a `catalog` (ManuscriptCatalog) is given, the manuscript's entry is
+    updated from the writer thread each time appended text is committed.
+    `sync()` picks up text other programs (such as bashout.sh) appended.
+    `metrics` is passed on to the writer (see ManuscriptWriter).
+    """
+
+    def __init__(self, save_dir, name, fsync_policy='interval', fsync_interval=0.5,
+                 on_durable=None, on_error=None, catalog=None, metrics=None, suffix='.txt'):
+        self.save_dir = Path(save_dir)
+        self.name = name
+        self.suffix = suffix
+        self.catalog = catalog
+        self.metrics = metrics
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.on_durable = on_durable
+        self.on_error = on_error
+        self.segments = None
+        self.index = None
+        self.writer = None
+        self.starting_words = 0
+        self.last_line = ''
+
+    @classmethod
+    def for_file(cls, path, **kwargs):
+        """Store for an arbitrary file path, such as the CLI's SAVE_FILE."""
+        path = Path(path).expanduser()
+        return cls(path.parent, path.stem, suffix=path.suffix, **kwargs)
+
+    @property
+    def path(self):
+        return self.save_dir / f"{self.name}{self.suffix}"
+
+    @property
+    def segment_dir(self):
+        return self.save_dir / f"{self.name}{SEGMENT_SUFFIX}"
+
+    @property
+    def write_path(self):
+        """The file new text is appended to."""
+        return self.segments.active_path if self.segments else self.path
+
+    @property
+    def words(self):
+        sealed = self.segments.sealed_words if self.segments else 0
+        return sealed + self.index.words
+
+    @property
+    def session_words(self):
+        return self.words - self.starting_words
+
+    @property
+    def size(self):
+        """Manuscript size in bytes, including appends not yet on disk."""
+        sealed = sum(segment['bytes'] for segment in self.segments.segments) if self.segments else 0
+        return sealed + self.index.size
+
+    def open(self):
+        """Create the manuscript if needed and load its state."""
+        if self.segment_dir.is_dir():
+            self.segments = SegmentedManuscript(self.segment_dir).load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.touch(exist_ok=True)
+        self.index = WordCountIndex(self.write_path)
+        self.index.refresh()
+        self.starting_words = self.words
+        self.last_line = read_last_line(self.write_path)
+        if not self.last_line and self.segments:
+            self.last_line = self.segments.sealed_last_line
+        if self.catalog:
+            self.catalog.update(self.catalog_entry())
+        self._start_writer()
+        return self
+
+    def append(self, text):
+        """Queue one line for the manuscript and return its sequence number."""
+        self.last_line = text.strip() or self.last_line
+        seq = self.writer.append(text + '\n')
+        if self.segments and self.index.size >= self.segments.segment_size:
+            self._roll_over()
+        return seq
+
+    def flush(self, timeout=None):
+        """Wait until everything appended so far is on disk."""
+        return self.writer.flush(timeout) if self.writer else True
+
+    def sync(self):
+        """Catch up with changes made to the manuscript by another program.
+
+        Our own appends are recognised by the file's size and cost a stat.
+        Anything else is counted from where the index left off if the file
+        only grew, or from scratch if it shrank or was rewritten. External
+        words count towards `starting_words`, not the session. Returns True
+        if the manuscript had changed.
+        """
+        try:
+            size = self.write_path.stat().st_size
+        except OSError:
+            return False
+        if size == (self.writer.written_size if self.writer else self.index.size):
+            return False
+        words = self.words
+        self.close()
+        try:
+            self.index.refresh()
+            self.starting_words += self.words - words
+            self.last_line = read_last_line(self.write_path)
+            if not self.last_line and self.segments:
+                self.last_line = self.segments.sealed_last_line
+            if self.catalog:
+                self.catalog.update(self.catalog_entry())
+        finally:
+            self._start_writer()
+        return True
+
+    def set_fsync_policy(self, fsync_policy, fsync_interval):
+        """Switch fsync policy, restarting the writer if it changed."""
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        if (fsync_policy, fsync_interval) == (self.fsync_policy, self.fsync_interval):
+            return
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        if self.writer:
+            self.close()
+            self._start_writer()
+
+    def iter_chunks(self, chunk_size=READ_CHUNK_SIZE):
+        """Yield the whole manuscript as plain-text bytes."""
+        self.flush()
+        if self.segments:
+            return self.segments.iter_chunks(chunk_size)
+        return iter_manuscript_chunks(self.path, chunk_size)
+
+    def rename(self, new_name):
+        """Rename the manuscript file, keeping its sidecar with it."""
+        old_path = self.segment_dir if self.segments else self.path
+        new_path = old_path.with_name(new_name + old_path.suffix)
+        if (self.save_dir / f"{new_name}{self.suffix}").exists() or \
+                (self.save_dir / f"{new_name}{SEGMENT_SUFFIX}").exists():
+            raise FileExistsError(f"A manuscript named '{new_name}' already exists.")
+        self.close()
+        try:
+            if self.segments:
+                # A compressor still running would write into the old directory
+                self.segments.wait_for_compression()
+            old_path.rename(new_path)
+            if self.catalog:
+                self.catalog.rename(self.name, new_name)
+            self.name = new_name
+            if self.segments:
+                self.segments = SegmentedManuscript(new_path).load()
+                self.index.path = self.write_path
+            else:
+                self.index.rename(new_path)
+        finally:
+            self._start_writer()
+
+    def close(self):
+        """Commit pending text and stop the writer."""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def _roll_over(self):
+        """Seal the active segment and start appending to a fresh one.
+
+        Only the totals move here; the writer thread renames the file and
+        saves the manifest once the text before it is on disk.
+        """
+        entry = self.segments.reserve(self.index.words, self.index.size, self.last_line)
+        self.index = WordCountIndex(self.write_path)
+        self.writer.index = self.index
+        self.writer.roll_over(lambda: self.segments.seal_active(entry['words'], entry))
+
+    def catalog_entry(self):
+        """This manuscript's ManuscriptCatalog entry."""
+        st = self.write_path.stat()
+        sealed = sum(segment['bytes'] for segment in self.segments.segments) if self.segments else 0
+        return {
+            'name': self.name,
+            'size': sealed + st.st_size,
+            'words': self.words,
+            'mtime_ns': st.st_mtime_ns,
+            'last_line': self.last_line,
+        }
+
+    def _committed(self, seq):
+        """Called on the writer thread once appends up to `seq` are on disk."""
+        if self.catalog:
+            try:
+                self.catalog.update(self.catalog_entry())
+            except (OSError, sqlite3.Error):
+                pass
+        if self.on_durable:
+            self.on_durable(seq)
+
+    def _start_writer(self):
+        self.writer = ManuscriptWriter(
+            self.write_path,
+            fsync_policy=self.fsync_policy,
+            fsync_interval=self.fsync_interval,
+            index=self.index,
+            on_durable=self._committed,
+            on_error=self.on_error,
+            metrics=self.metrics
+        )
+
+class LineOffsetIndex:
+    """Byte offsets of the lines of a text file, cached in a sidecar.
+
+    With `skip_blank` (the default) only non-blank lines are indexed. The
+    sidecar (`.<name>.idx` next to the file) holds a header (file size,
+    mtime, line count, a fingerprint of the last bytes indexed) followed by
+    the offsets as 64-bit integers, so reading line `i` is a single seek.
+    When the file has only grown, just the appended bytes are scanned and
+    the new offsets are appended to the sidecar; any other change rebuilds
+    it. If the directory isn't writable the index just stays in memory.
+    load(), save() and rename() are safe to call from several threads.
+    """
+
+    HEADER = struct.Struct(f'<QQQQH{FINGERPRINT_SIZE}s')
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, path, skip_blank=True):
+        self.path = Path(path)
+        self.skip_blank = skip_blank
+        self.offsets = array('Q')
+        self.size = 0
+        self.mtime_ns = 0
+        self.fingerprint = b''
+        self._saved = None  # offsets already in the sidecar, None if unknown
+        self.lock = threading.Lock()
+
+    @classmethod
+    def cached(cls, path, skip_blank=True):
+        """Return an up-to-date index for `path`, shared within the process."""
+        key = (Path(path), skip_blank)
+        with cls._cache_lock:
+            index = cls._cache.get(key)
+            if index is None:
+                index = cls._cache[key] = cls(path, skip_blank)
+        return index.load()
+
+    @property
+    def sidecar(self):
+        suffix = '.idx' if self.skip_blank else '.lines.idx'
+        return self.path.with_name(f".{self.path.name}{suffix}")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def load(self):
+        """Bring the offsets up to date with the file, scanning as little as possible."""
+        # Held throughout, or two threads would both append the same new lines
+        with self.lock:
+            try:
+                st = self.path.stat()
+            except OSError:
+                self._reset()
+                return self
+            if (st.st_size, st.st_mtime_ns) == (self.size, self.mtime_ns):
+                return self
+            if self._saved is None:
+                self._load_sidecar()
+            with open(self.path, 'rb') as f:
+                if not (st.st_size >= self.size and self._fingerprint_matches(f)):
+                    self._reset()
+                    self._saved = 0
+                self._scan(f)
+            self.mtime_ns = st.st_mtime_ns
+            self._save()
+        return self
+
+    def rename(self, new_path):
+        """Move the sidecar along with its renamed file."""
+        with self.lock:
+            old_sidecar = self.sidecar
+            self.path = Path(new_path)
+            try:
+                old_sidecar.replace(self.sidecar)
+            except OSError:
+                self._saved = None
+                self._save()
+
+    def read_line(self, i):
+        """Return line `i`, stripped."""
+        with open(self.path, 'rb') as f:
+            return self.read_line_from(f, i)
+
+    def read_line_from(self, f, i):
+        """Return line `i` using an already open binary file."""
+        f.seek(self.offsets[i])
+        return f.readline().decode('utf-8', errors='replace').strip()
+
+    def save(self):
+        """Write new offsets, then the header, so a crash leaves a valid sidecar."""
+        with self.lock:
+            self._save()
+
+    def _save(self):
+        header = self.HEADER.pack(self.size, self.mtime_ns, int(self.skip_blank), len(self.offsets),
+                                  len(self.fingerprint), self.fingerprint)
+        try:
+            if self._saved is not None and self._saved <= len(self.offsets) and self.sidecar.exists():
+                with open(self.sidecar, 'r+b') as f:
+                    f.seek(self.HEADER.size + 8 * self._saved)
+                    self.offsets[self._saved:].tofile(f)
+                    f.truncate()
+                    f.seek(0)
+                    f.write(header)
+            else:
+                tmp = self.sidecar.with_name(self.sidecar.name + '.tmp')
+                with open(tmp, 'wb') as f:
+                    f.write(header)
+                    self.offsets.tofile(f)
+                tmp.replace(self.sidecar)
+            self._saved = len(self.offsets)
+        except OSError:
+            pass
+
+    def _scan(self, f):
+        """Index the lines from self.size to the end of the file."""
+        # If the last indexed line had no newline yet, its continuation isn't a new line
+        continuing = self.size > 0 and not self.fingerprint.endswith(b'\n')
+        f.seek(self.size)
+        position = self.size
+        for line in f:
+            if continuing:
+                continuing = False
+            elif not self.skip_blank or line.strip():
+                self.offsets.append(position)
+            position += len(line)
+        start = max(0, position - FINGERPRINT_SIZE)
+        f.seek(start)
+        self.fingerprint = f.read(position - start)
+        self.size = position
+
+    def _fingerprint_matches(self, f):
+        f.seek(self.size - len(self.fingerprint))
+        return f.read(len(self.fingerprint)) == self.fingerprint
+
+    def _reset(self):
+        self.offsets = array('Q')
+        self.size = self.mtime_ns = 0
+        self.fingerprint = b''
+
+    def _load_sidecar(self):
+        self._saved = 0
+        try:
+            with open(self.sidecar, 'rb') as f:
+                size, mtime_ns, skip_blank, count, fp_len, fingerprint = \
+                    self.HEADER.unpack(f.read(self.HEADER.size))
+                if skip_blank != int(self.skip_blank):
+                    return
+                offsets = array('Q')
+                offsets.frombytes(f.read(8 * count))
+        except (OSError, struct.error, ValueError):
+            return
+        if len(offsets) != count:
+            return
+        self.offsets = offsets
+        self.size, self.mtime_ns = size, mtime_ns
+        self.fingerprint = fingerprint[:fp_len]
+        self._saved = count
+
+# Banner text
+VOICES = ["formal", "informal", "conversational", "professional", "academic",
+          "playful", "sarcastic", "intimate", "detached"]
+TONES = ["light-hearted", "serious", "dark", "humorous", "whimsical",
+         "melancholic", "uplifting", "suspenseful", "nostalgic"]
+TENSES = ["past", "present", "future"]
+POVS = ["first-person", "second-person", "third-person (limited)",
+        "third-person (omniscient)"]
+PACES = ["fast", "slow", "steadily", "frenetically"]
+
+def quote_files(resource_dir=RESOURCE_DIR):
+    """Quote corpus files: QUOTES_FILES in ~/.bashoutrc, else resources/quotes.txt."""
+    configured = read_bashoutrc().get('QUOTES_FILES')
+    if configured:
+        return [Path(p.strip()).expanduser() for p in configured.split(',') if p.strip()]
+    return [Path(resource_dir) / "quotes.txt"]
+
+class QuoteCorpus:
+    """Random quotes from one or more files, one quote per line.
+
+    Each file gets a LineOffsetIndex, so picking a quote is a seek to a
+    random offset rather than a read of the whole corpus. Quotes are drawn
+    uniformly across all files.
+    """
+
+    def __init__(self, paths):
+        self.paths = [Path(p) for p in paths]
+
+    def random_quote(self, rng=random):
+        indexes = [LineOffsetIndex.cached(p) for p in self.paths if p.exists()]
+        total = sum(len(index) for index in indexes)
+        if not total:
+            return "No quotes available."
+        pick = rng.randrange(total)
+        for index in indexes:
+            if pick < len(index):
+                return index.read_line(pick)
+            pick -= len(index)
+
+def get_random_quote(resource_dir=RESOURCE_DIR):
+    return QuoteCorpus(quote_files(resource_dir)).random_quote()
+
+def get_note(resource_dir=RESOURCE_DIR):
+    note_file = Path(resource_dir) / "note.txt"
+    if note_file.exists():
+        with open(note_file, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    return "No note available."
+
+def make_style_prompt(rng=random):
+    return (f"Create a {rng.choice(TONES)}, {rng.choice(PACES)}-paced story "
+            f"with a {rng.choice(VOICES)} voice in {rng.choice(TENSES)}-tense "
+            f"from a {rng.choice(POVS)} point of view.")
+
+def get_style_prompt(resource_dir=RESOURCE_DIR):
+    style = make_style_prompt()
+    style_file = Path(resource_dir) / "style.txt"
+    with open(style_file, 'w', encoding='utf-8') as f:
+        f.write(style)
+    return style
+
+def main(argv=None):
+    """Command line interface used by bashout.sh."""
+    import argparse
+    parser = argparse.ArgumentParser(prog='bashout_engine.py',
+                                     description="Headless BashOut manuscript engine.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in [('count', "print the manuscript's word count"),
+                            ('last-line', "print the last non-blank line"),
+                            ('status', "print the word count, then the last non-blank line")]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('file', type=Path)
+    commands.add_parser('quote', help="print a random quote from the quote corpus")
+    command = commands.add_parser('list', help="list the manuscripts in a save directory")
+    command.add_argument('save_dir', type=Path)
+    command = commands.add_parser('cat', help="print a plain or segmented manuscript as plain text")
+    command.add_argument('file', type=Path)
+    command = commands.add_parser('segment', help="convert a .txt manuscript to the segmented format")
+    command.add_argument('file', type=Path)
+    command.add_argument('--segment-size', type=int, default=DEFAULT_SEGMENT_SIZE,
+                         help="seal segments once they reach this many bytes")
+    command.add_argument('--no-compress', action='store_true',
+                         help="leave sealed segments uncompressed")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for entry in ManuscriptCatalog(args.save_dir).list():
+            print(f"{entry['name']}\t{entry['words']}\t{entry['size']}\t{entry['last_line']}")
+        return 0
+    if args.command == 'cat':
+        for chunk in iter_manuscript_chunks(args.file):
+            sys.stdout.buffer.write(chunk)
+        return 0
+    if args.command == 'segment':
+        manuscript = SegmentedManuscript.convert(args.file, args.segment_size,
+                                                 not args.no_compress)
+        print(f"{manuscript.directory}: {len(manuscript.segments)} sealed segments")
+        return 0
+
+    if args.command == 'quote':
+        print(get_random_quote())
+        return 0
+
+    if args.command in ('count', 'status'):
+        print(WordCountIndex(args.file).refresh())
+    if args.command in ('last-line', 'status'):
+        print(read_last_line(args.file))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
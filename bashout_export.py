@@ -0,0 +1,353 @@
+"""Export manuscripts to Markdown, HTML or EPUB.
+
+Manuscripts are streamed through a chain of generators (lines, paragraph
+grouping, typographic cleanup, a format writer), so memory use doesn't
+grow with the length of the book. Several manuscripts can be combined
+into one file, each becoming a chapter:
+
+    python3 bashout_export.py novel.txt -o novel.epub
+    python3 bashout_export.py ~/Documents/BashOut/*.txt -o draft.html --title "Draft"
+
+The stages pass around (kind, value) events: ('chapter', title) starts
+a chapter, ('paragraph', None) a paragraph and ('text', line) adds a line
+to the current paragraph.
+"""
+import argparse
+import codecs
+import html
+import itertools
+import re
+import sys
+import time
+import uuid
+import zipfile
+from pathlib import Path
+
+from bashout_engine import (READ_CHUNK_SIZE, SEGMENT_SUFFIX, iter_manuscript_chunks, manuscript_size,
+                            read_bashoutrc)
+
+FORMATS = {'.md': 'markdown', '.markdown': 'markdown', '.html': 'html', '.htm': 'html', '.epub': 'epub'}
+PARAGRAPH_MODES = ('auto', 'blank', 'line')
+
+class ExportCancelled(Exception):
+    """Raised when an export's `cancelled` callback returns True."""
+
+def manuscript_title(path):
+    """Display name of a plain or segmented manuscript."""
+    name = Path(path).name
+    for suffix in ('.txt', SEGMENT_SUFFIX):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def has_blank_lines(path, limit=READ_CHUNK_SIZE):
+    """True if the manuscript's first `limit` bytes include a blank line.
+
+    Manuscripts that separate paragraphs with blank lines do so from the
+    start, so there's no need to read the whole book to find out.
+    """
+    blank = re.compile(rb'(^|\n)[ \t\r]*\n')
+    chunk = next(iter_manuscript_chunks(path, limit), b'')
+    return blank.search(chunk) is not None
+
+def read_lines(path, on_chunk=None, chunk_size=READ_CHUNK_SIZE):
+    """Yield the manuscript's lines without their newlines.
+
+    `on_chunk(nbytes)` is called after each chunk is read, for progress
+    and cancellation.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    partial = ''
+    for chunk in iter_manuscript_chunks(path, chunk_size):
+        lines = (partial + decoder.decode(chunk)).split('\n')
+        partial = lines.pop()
+        yield from lines
+        if on_chunk:
+            on_chunk(len(chunk))
+    partial += decoder.decode(b'', final=True)
+    if partial:
+        yield partial
+
+def group_paragraphs(lines, mode='blank'):
+    """Turn lines into paragraph and text events.
+
+    In 'blank' mode, runs of non-blank lines form a paragraph; in 'line'
+    mode, as the GUI writes manuscripts, every line is its own paragraph.
+    """
+    in_paragraph = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            in_paragraph = False
+            continue
+        if not in_paragraph or mode == 'line':
+            yield ('paragraph', None)
+            in_paragraph = True
+        yield ('text', line)
+
+DASHES = re.compile(r'\s*-{2,3}\s*')
+OPENING_DOUBLE = re.compile(r'(^|[\s(\[{\u2014\u2013])"')
+OPENING_SINGLE = re.compile(r"(^|[\s(\[{\u2014\u2013\u201c])'")
+
+def smarten(text):
+    """Typographic cleanup: curly quotes, dashes, ellipses and single spaces."""
+    text = ' '.join(text.split())
+    # Most lines need none of this; the checks are much cheaper than the regexes
+    if '...' in text:
+        text = text.replace('...', '\u2026')
+    if '--' in text:
+        text = DASHES.sub('\u2014', text)
+    if '"' in text:
+        text = OPENING_DOUBLE.sub('\\1\u201c', text).replace('"', '\u201d')
+    if "'" in text:
+        text = OPENING_SINGLE.sub('\\1\u2018', text).replace("'", '\u2019')
+    return text
+
+def clean_typography(events):
+    for kind, value in events:
+        yield (kind, smarten(value) if kind == 'text' else value)
+
+def manuscript_events(paths, paragraphs='auto', on_chunk=None):
+    """The whole pipeline up to the writer, for one or many manuscripts.
+
+    With more than one manuscript each starts a chapter named after it.
+    """
+    for path in paths:
+        if len(paths) > 1:
+            yield ('chapter', manuscript_title(path))
+        mode = paragraphs
+        if mode == 'auto':
+            mode = 'blank' if has_blank_lines(path) else 'line'
+        yield from clean_typography(group_paragraphs(read_lines(path, on_chunk), mode))
+
+MARKDOWN_SPECIAL = re.compile(r'([\\`*_\[\]<>])')
+# A paragraph starting like this would become a heading, quote or list
+MARKDOWN_BLOCK_START = re.compile(r'^(#|>|[-+](?=\s|$))')
+# A backslash before a digit isn't an escape, so the list's delimiter is escaped instead
+MARKDOWN_ORDERED_LIST = re.compile(r'^(\d+)([.)])(?=\s|$)')
+# In a heading '#' also counts: a run of them at the end would be dropped
+MARKDOWN_HEADING_SPECIAL = re.compile(r'([\\`*_\[\]<>#])')
+
+def markdown_heading(level, title):
+    """A Markdown heading line whose title reads literally."""
+    return '#' * level + ' ' + MARKDOWN_HEADING_SPECIAL.sub(r'\\\1', title) + '\n'
+
+def write_markdown(events, out, title):
+    out.write(markdown_heading(1, title))
+    in_paragraph = starting = False
+    for kind, value in events:
+        if kind == 'text':
+            value = MARKDOWN_SPECIAL.sub(r'\\\1', value)
+            if starting:
+                value = MARKDOWN_BLOCK_START.sub(r'\\\1', value)
+                value = MARKDOWN_ORDERED_LIST.sub(r'\1\\\2', value)
+            out.write(value if starting else ' ' + value)
+            starting = False
+            continue
+        if in_paragraph:
+            out.write('\n')
+        if kind == 'chapter':
+            out.write('\n' + markdown_heading(2, value))
+            in_paragraph = False
+        else:
+            out.write('\n')
+            in_paragraph = starting = True
+    if in_paragraph:
+        out.write('\n')
+
+def write_html_body(events, out):
+    """Write paragraphs as HTML until the events run out or a chapter starts.
+
+    Returns the new chapter's title, or None at the end.
+    """
+    previous = None
+    for kind, value in events:
+        if kind == 'chapter':
+            break
+        if kind == 'paragraph':
+            out.write('</p>\n<p>' if previous else '<p>')
+        else:
+            if previous == 'text':
+                out.write(' ')
+            out.write(html.escape(value, quote=False))
+        previous = kind
+    else:
+        value = None
+    if previous:
+        out.write('</p>\n')
+    return value
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ max-width: 36em; margin: 2em auto; padding: 0 1em; font-family: Georgia, serif; line-height: 1.6; }}
+h1, h2 {{ text-align: center; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+"""
+
+def write_html(events, out, title):
+    events = iter(events)
+    out.write(HTML_HEAD.format(title=html.escape(title)))
+    chapter = write_html_body(events, out)
+    while chapter is not None:
+        out.write(f"<h2>{html.escape(chapter)}</h2>\n")
+        chapter = write_html_body(events, out)
+    out.write('</body>\n</html>\n')
+
+EPUB_CONTAINER = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+<rootfiles>
+<rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+</rootfiles>
+</container>
+"""
+
+EPUB_CHAPTER_HEAD = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
+<head><title>{title}</title></head>
+<body>
+<h1>{title}</h1>
+"""
+
+def write_epub(events, path, title):
+    """Write an EPUB 3 book with one XHTML file per chapter.
+
+    Each chapter is streamed straight into the zip; only the chapter
+    titles are kept for the table of contents.
+    """
+    events = iter(events)
+    first = next(events, None)
+    if first and first[0] == 'chapter':
+        chapter = first[1]
+    else:
+        chapter = title
+        events = itertools.chain([first] if first else [], events)
+    chapters = []
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as book:
+        # The mimetype must come first, uncompressed
+        book.writestr(zipfile.ZipInfo('mimetype'), 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        book.writestr('META-INF/container.xml', EPUB_CONTAINER)
+        while chapter is not None:
+            chapters.append(chapter)
+            with book.open(f'OEBPS/chapter-{len(chapters):04d}.xhtml', 'w', force_zip64=True) as raw:
+                out = _TextWriter(raw)
+                out.write(EPUB_CHAPTER_HEAD.format(title=html.escape(chapter)))
+                chapter = write_html_body(events, out)
+                out.write('</body>\n</html>\n')
+        book.writestr('OEBPS/nav.xhtml', _epub_nav(title, chapters))
+        book.writestr('OEBPS/content.opf', _epub_package(title, len(chapters)))
+
+class _TextWriter:
+    """Minimal UTF-8 text adapter for a binary zip member."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write(self, s):
+        self.raw.write(s.encode('utf-8'))
+
+def _epub_nav(title, chapters):
+    items = ''.join(f'<li><a href="chapter-{i:04d}.xhtml">{html.escape(name)}</a></li>\n'
+                    for i, name in enumerate(chapters, 1))
+    return (f'<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html>\n'
+            f'<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">\n'
+            f'<head><title>{html.escape(title)}</title></head>\n<body>\n'
+            f'<nav epub:type="toc"><h1>{html.escape(title)}</h1>\n<ol>\n{items}</ol></nav>\n'
+            f'</body>\n</html>\n')
+
+def _epub_package(title, count):
+    modified = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    manifest = ''.join(f'<item id="c{i}" href="chapter-{i:04d}.xhtml" media-type="application/xhtml+xml"/>\n'
+                       for i in range(1, count + 1))
+    spine = ''.join(f'<itemref idref="c{i}"/>\n' for i in range(1, count + 1))
+    return (f'<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">\n'
+            f'<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'<dc:identifier id="id">urn:uuid:{uuid.uuid4()}</dc:identifier>\n'
+            f'<dc:title>{html.escape(title)}</dc:title>\n<dc:language>en</dc:language>\n'
+            f'<meta property="dcterms:modified">{modified}</meta>\n</metadata>\n'
+            f'<manifest>\n<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>\n'
+            f'{manifest}</manifest>\n<spine>\n{spine}</spine>\n</package>\n')
+
+def export(paths, output, fmt=None, title=None, paragraphs='auto', progress=None, cancelled=None):
+    """Export the manuscripts at `paths` to `output`.
+
+    `fmt` defaults to the one implied by the output's suffix. `progress`
+    is called with (bytes read, total bytes) as the manuscripts are read;
+    if `cancelled()` returns True the export stops with ExportCancelled
+    and no output file is left behind. The output only replaces an
+    existing file once the export has finished.
+    """
+    paths = [Path(p) for p in paths]
+    output = Path(output)
+    fmt = fmt or FORMATS.get(output.suffix.lower())
+    if fmt not in ('markdown', 'html', 'epub'):
+        raise ValueError(f"Unknown export format for {output.name}; use .md, .html or .epub")
+    if paragraphs not in PARAGRAPH_MODES:
+        raise ValueError(f"Unknown paragraph mode: {paragraphs}")
+    title = title or (manuscript_title(paths[0]) if len(paths) == 1 else output.stem)
+    total = sum(manuscript_size(p) for p in paths)
+    done = 0
+
+    def on_chunk(nbytes):
+        nonlocal done
+        done += nbytes
+        if cancelled and cancelled():
+            raise ExportCancelled()
+        if progress:
+            progress(done, total)
+
+    events = manuscript_events(paths, paragraphs, on_chunk)
+    tmp = output.with_name(f".{output.name}.tmp")
+    try:
+        if fmt == 'epub':
+            write_epub(events, tmp, title)
+        else:
+            with open(tmp, 'w', encoding='utf-8') as out:
+                (write_markdown if fmt == 'markdown' else write_html)(events, out, title)
+        tmp.replace(output)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return output
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export BashOut manuscripts to Markdown, HTML or EPUB.")
+    parser.add_argument('manuscripts', nargs='+', type=Path,
+                        help="manuscript files or .bashout folders; several are combined as chapters")
+    parser.add_argument('-o', '--output', type=Path, required=True,
+                        help="output file; the format follows its suffix (.md, .html, .epub)")
+    parser.add_argument('--format', choices=['markdown', 'html', 'epub'], default=None)
+    parser.add_argument('--title', default=None)
+    parser.add_argument('--paragraphs', choices=PARAGRAPH_MODES,
+                        default=read_bashoutrc().get('EXPORT_PARAGRAPHS', 'auto'),
+                        help="'blank': blank lines separate paragraphs; 'line': every line is one; "
+                             "'auto' (default): 'blank' if the manuscript starts out using blank lines")
+    parser.add_argument('--quiet', action='store_true', help="don't print progress")
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        if not args.quiet:
+            print(f"\r{done * 100 // max(total, 1)}%", end='', file=sys.stderr, flush=True)
+
+    try:
+        export(args.manuscripts, args.output, args.format, args.title, args.paragraphs, progress)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("\nCancelled", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(f"\rWrote {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
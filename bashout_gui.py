@@ -1,31 +1,18 @@
 import sys
-import os
-import random
+import time
+
+# Taken before the heavy imports so --profile-startup covers them
+STARTUP_T0 = time.perf_counter()
+
 import subprocess
 import json
+import sqlite3
+import threading
+import datetime
+import html
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QLabel, QLineEdit, QPushButton, 
-                            QTextEdit, QFrame, QComboBox, QSpinBox, QFileDialog,
-                            QMessageBox, QMenu, QAction, QInputDialog)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QPalette, QColor, QKeyEvent, QPainter, QTextOption
-
-# Constants
-CONFIG_FILE = Path.home() / '.bashout_config.json'
-DEFAULT_SAVE_DIR = Path.home() / 'Documents' / 'BashOut'
-BASHOUTRC = Path.home() / '.bashoutrc'
-
-# Helper to read ~/.bashoutrc key:value pairs
-bashoutrc_defaults = {}
-if BASHOUTRC.exists():
-    with open(BASHOUTRC, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#') or ':' not in line:
-                continue
-            key, value = line.split(':', 1)
-            bashoutrc_defaults[key.strip().upper()] = value.strip()
 
 def check_and_install_dependencies():
     """Check for required packages and install if missing."""
@@ -54,8 +41,62 @@ def check_and_install_dependencies():
             print("Please try running these commands manually:")
             print(f"pip install --user {' '.join(missing_packages)}")
             sys.exit(1)
+        # A fresh --user install may not be on sys.path yet
+        import importlib
+        import site
+        site.addsitedir(site.getusersitepackages())
+        importlib.invalidate_caches()
+
+# Only probe and install dependencies when PyQt5 is actually missing
+try:
+    import PyQt5
+except ImportError:
+    check_and_install_dependencies()
+
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                            QHBoxLayout, QLabel, QLineEdit, QPushButton, 
+                            QTextEdit, QFrame, QComboBox, QSpinBox, QFileDialog,
+                            QMessageBox, QMenu, QAction, QInputDialog, QDialog,
+                            QDialogButtonBox, QListWidget, QListWidgetItem,
+                            QTableView, QHeaderView, QAbstractItemView, QProgressDialog)
+from PyQt5.QtCore import (Qt, QTimer, pyqtSignal, QAbstractListModel, QModelIndex,
+                          QFileSystemWatcher, QRectF)
+from PyQt5.QtGui import QFont, QPalette, QColor, QKeyEvent, QPainter, QTextOption, QPen
+from bashout_metrics import SessionMetrics
+from bashout_banners import BannerService, CoalescingWriter, default_providers
+from bashout_export import ExportCancelled, export
+from bashout_history import HistoryStore, daily_goal, streaks
+from bashout_phrases import DEFAULT_PHRASE_WORDS, PhraseIndex
+from bashout_search import DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT, SearchIndex
+from bashout_snapshots import SnapshotError, SnapshotStore
+from bashout_engine import (BASHOUTRC, CONFIG_FILE, DEFAULT_SAVE_DIR, FSYNC_POLICIES, LineOffsetIndex,
+                            ManuscriptCatalog, ManuscriptStore, SEGMENT_SUFFIX,
+                            read_bashoutrc, valid_manuscript_name)
+
+class StartupProfile:
+    """Phase-by-phase timings from process start to an editable input field."""
+
+    def __init__(self, start):
+        self.start = start
+        self.marks = []
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter()))
+
+    @property
+    def total_ms(self):
+        return (self.marks[-1][1] - self.start) * 1000 if self.marks else 0.0
+
+    def report(self):
+        lines = [f"{'phase':<28}{'ms':>10}{'total ms':>10}"]
+        previous = self.start
+        for phase, t in self.marks:
+            lines.append(f"{phase:<28}{(t - previous) * 1000:>10.1f}{(t - self.start) * 1000:>10.1f}")
+            previous = t
+        return '\n'.join(lines)
 
-check_and_install_dependencies()
+startup_profile = StartupProfile(STARTUP_T0)
+startup_profile.mark('imports')
 
 # Theme colors
 THEMES = {
@@ -63,6 +104,7 @@ THEMES = {
         'window': '#ffffff',
         'text': '#000000',
         'banner': '#1a73e8',
+        'repeat': '#fde293',
         'input_bg': '#ffffff',
         'input_text': '#000000',
         'button_bg': '#f0f0f0',
@@ -72,6 +114,7 @@ THEMES = {
         'window': '#2d2d2d',
         'text': '#ffffff',
         'banner': '#8ab4f8',
+        'repeat': '#6b5900',
         'input_bg': '#3d3d3d',
         'input_text': '#ffffff',
         'button_bg': '#3d3d3d',
@@ -79,14 +122,45 @@ THEMES = {
     }
 }
 
+# DEFAULT_BANNER values in ~/.bashoutrc, as in the CLI menu
+BANNER_STYLES = {'1': 'Quote', '2': 'Note', '3': 'Prompt'}
+
+# Changes to watched files are handled once they settle for this long
+FILE_SYNC_DELAY_MS = 200
+# Longest QTimer interval: a signed 32-bit count of milliseconds, about 24 days
+MAX_TIMER_MS = 2 ** 31 - 1
+
+def rc_int(config, key, default, invalid=None):
+    """Whole-number setting from ~/.bashoutrc, or `default` if it isn't set.
+
+    A value that isn't a whole number gives `invalid` instead, if it is given.
+    """
+    if key not in config:
+        return default
+    try:
+        return int(config[key])
+    except ValueError:
+        return default if invalid is None else invalid
+
+def repeat_words(config, invalid=None):
+    """GUI_REPEAT_WORDS from ~/.bashoutrc, 0 (off) to the longest phrase a sidecar records."""
+    # PhraseIndex.HEADER stores the phrase length as an unsigned short
+    return min(max(rc_int(config, 'GUI_REPEAT_WORDS', DEFAULT_PHRASE_WORDS, invalid), 0), 0xFFFF)
+
 class CenteredPlaceholderTextEdit(QTextEdit):
+    first_painted = pyqtSignal()
+
     def __init__(self, placeholder_text="", parent=None):
         super().__init__(parent)
         self.placeholder_text = placeholder_text
         self.setPlaceholderText("")
+        self.painted = False
 
     def paintEvent(self, event):
         super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_painted.emit()
         if self.toPlainText() == "" and not self.hasFocus():
             painter = QPainter(self.viewport())
             painter.setPen(QColor("#808080"))  # Gray color for placeholder
@@ -95,18 +169,435 @@ class CenteredPlaceholderTextEdit(QTextEdit):
             rect = self.viewport().rect()
             painter.drawText(rect, Qt.AlignCenter, self.placeholder_text)
 
+class ManuscriptSwitcher(QDialog):
+    """Filterable list of the manuscripts in the save location."""
+
+    def __init__(self, entries, current=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Open Manuscript')
+        self.setMinimumSize(420, 360)
+        layout = QVBoxLayout(self)
+
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText('Filter manuscripts')
+        self.filter.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.filter)
+
+        self.list = QListWidget()
+        self.list.setUniformItemSizes(True)
+        for entry in entries:
+            item = QListWidgetItem(f"{entry['name']}  ({entry['words']} words)")
+            item.setData(Qt.UserRole, entry['name'])
+            item.setToolTip(entry['last_line'])
+            self.list.addItem(item)
+            if entry['name'] == current:
+                self.list.setCurrentItem(item)
+        self.list.itemActivated.connect(self.accept)
+        layout.addWidget(self.list)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Open | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def apply_filter(self, text):
+        text = text.lower()
+        for i in range(self.list.count()):
+            item = self.list.item(i)
+            item.setHidden(text not in item.data(Qt.UserRole).lower())
+
+    def selected_name(self):
+        item = self.list.currentItem()
+        return item.data(Qt.UserRole) if item and not item.isHidden() else None
+
+def plural(n, noun):
+    return f"{n} {noun}" if n == 1 else f"{n} {noun}s"
+
+class SearchDialog(QDialog):
+    """Search every manuscript as you type; open a result to go to its line."""
+
+    SEARCH_DELAY_MS = 150
+
+    def __init__(self, index, current=None, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.current = current
+        self.setWindowTitle('Search Manuscripts')
+        self.setMinimumSize(560, 400)
+        layout = QVBoxLayout(self)
+
+        self.query = QLineEdit()
+        self.query.setPlaceholderText('Words, "exact phrases" or prefix*')
+        layout.addWidget(self.query)
+
+        self.results = QListWidget()
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(self.accept)
+        layout.addWidget(self.results)
+
+        self.status = QLabel()
+        layout.addWidget(self.status)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Open | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        # Search once typing pauses rather than on every keystroke
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.SEARCH_DELAY_MS)
+        self.timer.timeout.connect(self.run_search)
+        self.query.textChanged.connect(self.timer.start)
+
+    def run_search(self):
+        self.results.clear()
+        started = time.perf_counter()
+        try:
+            results = self.index.search(self.query.text(), first=self.current)
+        except sqlite3.Error as e:
+            self.status.setText(f"Search failed: {e}")
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        for result in results:
+            item = QListWidgetItem(f"{result['name']}:{result['line']}  {result['text']}")
+            item.setData(Qt.UserRole, (result['name'], result['line']))
+            item.setToolTip(result['text'])
+            self.results.addItem(item)
+        if results:
+            self.results.setCurrentRow(0)
+        more = " (showing the first)" if len(results) == DEFAULT_SEARCH_LIMIT else ""
+        self.status.setText(f"{plural(len(results), 'line')}{more} in {elapsed:.1f} ms")
+
+    def selected_result(self):
+        """(manuscript name, 1-based line number) of the chosen result, or None."""
+        item = self.results.currentItem()
+        return item.data(Qt.UserRole) if item else None
+
+class HistoryChart(QWidget):
+    """Bar chart of words per day, with the daily goal as a dashed line.
+
+    When there are more days than pixels, each bar shows the average of
+    the days it covers, so the goal line still applies.
+    """
+
+    def __init__(self, theme, parent=None):
+        super().__init__(parent)
+        self.theme = theme
+        self.words = []
+        self.first = 0
+        self.goal = 0
+        self.setMinimumSize(480, 220)
+
+    def set_data(self, words, first, goal):
+        """Show `words` per day, the first of which is day ordinal `first`."""
+        self.words, self.first, self.goal = words, first, goal
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        text = QColor(self.theme['text'])
+        painter.setPen(text)
+        chart = self.rect().adjusted(50, 10, -10, -24)
+        days = len(self.words)
+        if not days or chart.width() <= 0 or chart.height() <= 0:
+            return
+        bars = min(days, chart.width())
+        values = []
+        for i in range(bars):
+            start, end = i * days // bars, (i + 1) * days // bars
+            values.append(sum(self.words[start:end]) / (end - start))
+        top = max(max(values), self.goal, 1)
+        bar_width = chart.width() / bars
+        gap = 1 if bar_width >= 3 else 0
+        met = QColor(self.theme['banner'])
+        unmet = QColor(text)
+        unmet.setAlpha(110)
+        for i, value in enumerate(values):
+            height = value / top * chart.height()
+            painter.fillRect(QRectF(chart.left() + i * bar_width, chart.bottom() + 1 - height,
+                                    max(bar_width - gap, 1), height),
+                             met if self.goal and value >= self.goal else unmet)
+        if self.goal:
+            y = chart.bottom() + 1 - self.goal / top * chart.height()
+            painter.setPen(QPen(text, 1, Qt.DashLine))
+            painter.drawLine(chart.left(), int(y), chart.right(), int(y))
+            painter.setPen(text)
+        painter.drawLine(chart.bottomLeft(), chart.bottomRight())
+        painter.drawText(QRectF(0, chart.top(), chart.left() - 6, 20),
+                         Qt.AlignRight | Qt.AlignTop, f"{top:.0f}")
+        painter.drawText(QRectF(0, chart.bottom() - 20, chart.left() - 6, 20),
+                         Qt.AlignRight | Qt.AlignBottom, "0")
+        label_rect = QRectF(chart.left(), chart.bottom() + 4, chart.width(), 20)
+        painter.drawText(label_rect, Qt.AlignLeft,
+                         datetime.date.fromordinal(self.first).isoformat())
+        painter.drawText(label_rect, Qt.AlignRight,
+                         datetime.date.fromordinal(self.first + days - 1).isoformat())
+
+class HistoryDialog(QDialog):
+    """Words per day, goal and streaks, from the writing history alone."""
+
+    RANGES = [('Last 30 days', 30), ('Last 90 days', 90), ('Last year', 365), ('All time', None)]
+
+    def __init__(self, history_store, manuscript, goal, theme, parent=None):
+        super().__init__(parent)
+        self.history_store = history_store
+        self.goal = goal
+        self.setWindowTitle('Writing History')
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.scope = QComboBox()
+        self.scope.addItem('All manuscripts', None)
+        if manuscript:
+            self.scope.addItem(manuscript, manuscript)
+        self.scope.currentIndexChanged.connect(self.refresh)
+        self.range = QComboBox()
+        for label, days in self.RANGES:
+            self.range.addItem(label, days)
+        self.range.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.scope)
+        controls.addStretch()
+        controls.addWidget(self.range)
+        layout.addLayout(controls)
+
+        self.chart = HistoryChart(theme)
+        layout.addWidget(self.chart)
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.refresh()
+
+    def refresh(self):
+        history = self.history_store.history(self.scope.currentData())
+        today = datetime.date.today().toordinal()
+        days = self.range.currentData()
+        if days:
+            first = today - days + 1
+        else:
+            first = min(history.days[0], today) if history.days else today
+        self.chart.set_data(history.daily(first, today), first, self.goal)
+        current, longest = streaks(history, self.goal, today)
+        goal = f"{self.goal} words a day" if self.goal else "none (any writing counts)"
+        self.summary.setText(
+            f"Today: {history.words_on(today)} words    Goal: {goal}\n"
+            f"Current streak: {plural(current, 'day')}    Longest: {plural(longest, 'day')}    "
+            f"Total: {plural(sum(history.words), 'word')} over {plural(len(history), 'day')}")
+
+class ManuscriptLinesModel(QAbstractListModel):
+    """The manuscript's lines as a list model, read from disk on demand.
+
+    Only the line offsets are held in memory (and persisted by
+    LineOffsetIndex); the text of a row is read when the view asks for it,
+    so scrolling cost doesn't depend on the manuscript's length. Building
+    the offsets can mean reading the whole file, so set_path() does it on a
+    worker thread and emits `ready` once the rows are in.
+    """
+
+    CACHE_SIZE = 256
+
+    # Emitted once the rows of set_path()'s file are in
+    ready = pyqtSignal()
+    # Emitted from the loading thread: (generation, LineOffsetIndex)
+    loaded = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self.lines = None
+        self.file = None
+        self.cache = OrderedDict()
+        self.generation = 0
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bashout-scrollback')
+        self.loaded.connect(self.on_loaded)
+
+    @property
+    def loading(self):
+        return self.path is not None and self.lines is None
+
+    def set_path(self, path):
+        """Show the file at `path` once its lines are indexed, or nothing if `path` is None."""
+        self.generation += 1
+        self.beginResetModel()
+        self.close()
+        self.path = path
+        self.lines = None
+        self.cache.clear()
+        self.endResetModel()
+        if path:
+            self.pool.submit(self.run_load, self.generation, path)
+
+    def run_load(self, generation, path):
+        if generation != self.generation:
+            return
+        try:
+            index = LineOffsetIndex(path, skip_blank=False).load()
+        except OSError:
+            # Shown empty until the next set_path()
+            return
+        self.loaded.emit(generation, index)
+
+    def on_loaded(self, generation, index):
+        if generation != self.generation:
+            return
+        self.beginResetModel()
+        self.lines = index
+        self.reopen()
+        self.endResetModel()
+        # Lines saved while the index was being built
+        self.refresh()
+        if not self.loading:
+            self.ready.emit()
+
+    def rename(self, path):
+        """Follow the file to `path`, keeping its index."""
+        if self.lines is not None:
+            self.path = path
+            self.lines.rename(path)
+            self.reopen()
+        elif self.loading:
+            self.set_path(path)
+
+    def refresh(self):
+        """Pick up lines appended since the last refresh."""
+        if self.lines is None:
+            return
+        try:
+            size = self.lines.path.stat().st_size
+        except OSError:
+            size = 0
+        if size < self.lines.size:
+            # Rewritten or a new segment: start over
+            self.set_path(self.path)
+            return
+        before = len(self.lines)
+        self.lines.load()
+        self.reopen()
+        if len(self.lines) < before:
+            # Replaced by a file at least as long
+            self.beginResetModel()
+            self.endResetModel()
+            return
+        # A partial last line may have grown
+        self.cache.pop(before - 1, None)
+        if len(self.lines) > before:
+            self.beginInsertRows(QModelIndex(), before, len(self.lines) - 1)
+            self.endInsertRows()
+
+    def reopen(self):
+        self.close()
+        self.cache.clear()
+        if self.lines is not None:
+            try:
+                self.file = open(self.lines.path, 'rb')
+            except OSError:
+                self.file = None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.lines is None:
+            return 0
+        return len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid() or self.file is None:
+            return None
+        row = index.row()
+        line = self.cache.get(row)
+        if line is None:
+            try:
+                line = self.lines.read_line_from(self.file, row)
+            except (OSError, IndexError):
+                return None
+            self.cache[row] = line
+            if len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(row)
+        return line
+
 class BashOutWindow(QMainWindow):
+    # Emitted from the writer thread; Qt queues them onto the GUI thread
+    durable_changed = pyqtSignal(int)
+    write_failed = pyqtSignal(str)
+    # Emitted from the export thread
+    export_progress = pyqtSignal(int)
+    export_finished = pyqtSignal(str)
+    # Emitted from banner workers: (request number, banner)
+    banner_ready = pyqtSignal(int, str)
+    # Emitted from the phrase thread: (generation, PhraseIndex)
+    phrases_ready = pyqtSignal(int, object)
+
+    startup_finished = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         # Use bashoutrc values as defaults
+        bashoutrc_defaults = read_bashoutrc()
+        self.bashoutrc = bashoutrc_defaults
         self.current_theme = bashoutrc_defaults.get('GUI_THEME', 'light')
-        self.font_size_default = int(bashoutrc_defaults.get('GUI_FONT_SIZE', 12))
+        self.font_size_default = rc_int(bashoutrc_defaults, 'GUI_FONT_SIZE', 12)
         self.save_dir = Path(bashoutrc_defaults.get('SAVE_FILE', str(DEFAULT_SAVE_DIR))).expanduser().parent
         self.current_manuscript = None
+        self.fsync_policy = bashoutrc_defaults.get('GUI_FSYNC', 'interval')
+        if self.fsync_policy not in FSYNC_POLICIES:
+            self.fsync_policy = 'interval'
+        self.fsync_interval = max(rc_int(bashoutrc_defaults, 'GUI_FSYNC_INTERVAL_MS', 500), 0) / 1000
+        self.store = None
+        self.catalog = None
+        self.history = None
+        self.search_index = None
+        # Indexing for search runs on its own thread, one update at a time
+        self.search_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bashout-search')
+        self.search_pending = False
+        self.search_cancel = threading.Event()
+        # The repeated-phrase index is built and extended on its own thread too;
+        # `phrases` is None until the current manuscript's index is ready
+        self.phrases = None
+        self.phrase_words = repeat_words(bashoutrc_defaults)
+        self.phrase_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bashout-phrases')
+        self.phrase_generation = 0
+        self.phrase_pending = False
+        self.phrase_cancel = threading.Event()
+        self.phrases_ready.connect(self.on_phrases_ready)
+        self.daily_goal = daily_goal(bashoutrc_defaults)
+        # (day, goal met, current streak), recomputed only when the first two change
+        self.streak = None
+        self.metrics = SessionMetrics()
+        self.metrics_file = bashoutrc_defaults.get('GUI_METRICS_FILE')
+        self.snapshot_interval = rc_int(bashoutrc_defaults, 'GUI_SNAPSHOT_INTERVAL_MIN', 60)
+        self.snapshot_thread = None
+        self.banner_writer = CoalescingWriter()
+        self.banners = BannerService(default_providers(self.banner_writer))
+        self.banner_request = 0
+        self.banner_rotate = rc_int(bashoutrc_defaults, 'GUI_BANNER_ROTATE_SEC', 0)
+        self.banner_ready.connect(self.on_banner_ready)
+        self.file_watcher = None
+        self.export_thread = None
+        self.export_cancel = threading.Event()
+        self.export_dialog = None
+        self.export_progress.connect(self.on_export_progress)
+        self.export_finished.connect(self.on_export_finished)
+        self.changed_paths = set()
+        self.durable_changed.connect(self.on_durable_changed)
+        self.write_failed.connect(self.on_write_failed)
+        self.default_banner = BANNER_STYLES.get(bashoutrc_defaults.get('DEFAULT_BANNER', '1'), 'Quote')
         self.load_config()
+        startup_profile.mark('config')
         self.init_ui()
+        startup_profile.mark('widgets')
         self.load_initial_state()
-        self.apply_theme()
+        startup_profile.mark('manuscript')
+        # Only the cheap palette now; the stylesheet and banner wait for first paint
+        self.apply_palette()
+        self.input_field.first_painted.connect(self.on_first_paint)
 
     def load_config(self):
         """Load or create configuration."""
@@ -156,10 +647,20 @@ class BashOutWindow(QMainWindow):
             "untitled"
         )
         if ok and name:
+            if not valid_manuscript_name(name):
+                self.warn_invalid_name(name)
+                return
             self.current_manuscript = name
             self.save_config()
             self.load_initial_state()
 
+    def warn_invalid_name(self, name):
+        QMessageBox.warning(
+            self,
+            "Error",
+            f"'{name}' can't be used as a manuscript name: names can't start with '.' or contain '/'."
+        )
+
     def save_config(self):
         """Save current configuration."""
         config = {
@@ -211,6 +712,12 @@ class BashOutWindow(QMainWindow):
         self.word_count.setFont(QFont('Helvetica', 13))
         word_count_layout.addWidget(word_count_label)
         word_count_layout.addWidget(self.word_count)
+        self.save_status = QLabel('Saved')
+        self.save_status.setFont(QFont('Helvetica', 11))
+        word_count_layout.addWidget(self.save_status)
+        self.goal_status = QLabel()
+        self.goal_status.setFont(QFont('Helvetica', 11))
+        word_count_layout.addWidget(self.goal_status)
         word_count_layout.setAlignment(Qt.AlignCenter)
         controls_layout.addLayout(word_count_layout)
         
@@ -221,8 +728,8 @@ class BashOutWindow(QMainWindow):
         banner_style_label.setFont(QFont('Helvetica', 13))
         self.banner_style = QComboBox()
         self.banner_style.setFont(QFont('Helvetica', 13))
-        self.banner_style.addItems(['Quote', 'Note', 'Prompt'])
-        self.banner_style.setCurrentText('Quote')
+        self.banner_style.addItems(self.banners.names)
+        self.banner_style.setCurrentText(self.default_banner)
         self.banner_style.currentTextChanged.connect(self.on_banner_style_changed)
         banner_style_layout.addWidget(banner_style_label)
         banner_style_layout.addWidget(self.banner_style)
@@ -241,9 +748,31 @@ class BashOutWindow(QMainWindow):
         self.last_sentence.setWordWrap(True)
         layout.addWidget(self.last_sentence)
 
+        # Scrollback of the manuscript's unsealed text (toggled from the manuscript menu)
+        self.scrollback_model = ManuscriptLinesModel(self)
+        # A one-column table with fixed-height rows: unlike a list view it
+        # doesn't lay out every row, so restyling a long manuscript is instant
+        self.scrollback = QTableView()
+        self.scrollback.setModel(self.scrollback_model)
+        self.scrollback.horizontalHeader().hide()
+        self.scrollback.horizontalHeader().setStretchLastSection(True)
+        self.scrollback.verticalHeader().hide()
+        self.scrollback.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.scrollback.verticalHeader().setDefaultSectionSize(self.scrollback.fontMetrics().lineSpacing() + 2)
+        self.scrollback.setShowGrid(False)
+        self.scrollback.setWordWrap(False)
+        self.scrollback.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.scrollback.setSelectionMode(QAbstractItemView.NoSelection)
+        self.scrollback.setFocusPolicy(Qt.NoFocus)
+        self.scrollback.setVisible(False)
+        layout.addWidget(self.scrollback)
+        # Row to scroll to once the scrollback has loaded, None for the bottom
+        self.scrollback_row = None
+        self.scrollback_model.ready.connect(self.on_scrollback_ready)
+
         # Input field
         self.input_field = CenteredPlaceholderTextEdit(
-            "Type your text here. Press Enter to add to saved file.\nCmd+N: New manuscript | Cmd+R: Rename manuscript"
+            "Type your text here. Press Enter to add to saved file.\nCmd+N: New manuscript | Cmd+O: Open manuscript | Cmd+R: Rename manuscript | Cmd+F: Search"
         )
         self.input_field.setFont(QFont('Helvetica', self.font_size_default))
         self.input_field.textChanged.connect(self.on_text_changed)
@@ -274,6 +803,48 @@ class BashOutWindow(QMainWindow):
         
         layout.addLayout(bottom_controls)
 
+        # Session metrics overlay (toggled from the manuscript menu)
+        self.metrics_overlay = QLabel()
+        self.metrics_overlay.setFont(QFont('Courier', 10))
+        self.metrics_overlay.setVisible(False)
+        layout.addWidget(self.metrics_overlay)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(1000)
+        self.metrics_timer.timeout.connect(self.update_metrics_overlay)
+
+    def apply_palette(self):
+        """Apply the theme's base colors without the (slower) stylesheet."""
+        theme = THEMES[self.current_theme]
+        palette = self.palette()
+        palette.setColor(QPalette.Window, QColor(theme['window']))
+        palette.setColor(QPalette.WindowText, QColor(theme['text']))
+        palette.setColor(QPalette.Base, QColor(theme['input_bg']))
+        palette.setColor(QPalette.Text, QColor(theme['input_text']))
+        palette.setColor(QPalette.Button, QColor(theme['button_bg']))
+        palette.setColor(QPalette.ButtonText, QColor(theme['button_text']))
+        self.setPalette(palette)
+
+    def on_first_paint(self):
+        startup_profile.mark('first paint')
+        # Let the first frame reach the screen before the deferred work
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Work deferred until the window has painted once."""
+        self.apply_theme()
+        startup_profile.mark('stylesheet')
+        self.on_banner_style_changed(self.banner_style.currentText())
+        self.banner_timer = QTimer(self)
+        self.banner_timer.timeout.connect(self.rotate_banner)
+        if self.banner_rotate > 0:
+            self.banner_timer.start(min(self.banner_rotate * 1000, MAX_TIMER_MS))
+        startup_profile.mark('banner')
+        self.init_file_watcher()
+        self.init_snapshots()
+        self.input_field.setFocus()
+        startup_profile.mark('input ready')
+        self.startup_finished.emit()
+
     def apply_theme(self):
         theme = THEMES[self.current_theme]
         
@@ -365,8 +936,15 @@ class BashOutWindow(QMainWindow):
                 elif event.key() == Qt.Key_R:
                     self.rename_current_manuscript()
                     return True
+                elif event.key() == Qt.Key_O:
+                    self.open_manuscript()
+                    return True
+                elif event.key() == Qt.Key_F:
+                    self.search_manuscripts()
+                    return True
             elif event.key() == Qt.Key_Return and not event.modifiers():
-                self.add_sentence()
+                with self.metrics.timer('keypress'):
+                    self.add_sentence()
                 return True
         return super().eventFilter(obj, event)
 
@@ -378,24 +956,36 @@ class BashOutWindow(QMainWindow):
         """Load the initial state of the application."""
         if self.current_manuscript:
             self.title_button.setText(self.current_manuscript)
-            self.SAVE_FILE = self.save_dir / f"{self.current_manuscript}.txt"
-            self.SAVE_FILE.parent.mkdir(parents=True, exist_ok=True)
-            self.SAVE_FILE.touch(exist_ok=True)
+            self.close_store()
+            self.store = ManuscriptStore(
+                self.save_dir,
+                self.current_manuscript,
+                fsync_policy=self.fsync_policy,
+                fsync_interval=self.fsync_interval,
+                on_durable=self.durable_changed.emit,
+                on_error=lambda e: self.write_failed.emit(str(e)),
+                catalog=self.get_catalog(),
+                metrics=self.metrics
+            ).open()
+            self.save_status.setText('Saved')
             
-            # Initialize word counts
-            self.starting_word_count = self.count_words(self.SAVE_FILE)
+            # Initialize word counts from the sidecar index
+            self.starting_word_count = self.store.starting_words
             self.session_word_count = 0
             self.total_word_count = self.starting_word_count
             
             # Load last sentence
-            if self.SAVE_FILE.exists() and self.SAVE_FILE.stat().st_size > 0:
-                with open(self.SAVE_FILE, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    if lines:
-                        self.last_sentence.setText(lines[-1].strip())
+            self.set_last_sentence(self.store.last_line)
+            if self.scrollback.isVisible():
+                self.show_scrollback_lines()
             
             # Update word count display
             self.update_word_count()
+            self.update_goal_status()
+            self.index_for_search()
+            self.load_phrases()
+            if self.file_watcher:
+                self.watch_files()
 
     def save_text(self, text):
         """Save text to the current manuscript."""
@@ -404,76 +994,456 @@ class BashOutWindow(QMainWindow):
             if not self.current_manuscript:  # User cancelled
                 return
         
-        with open(self.SAVE_FILE, 'a', encoding='utf-8') as f:
-            f.write(text + '\n')
-        self.last_sentence.setText(text)
-        self.update_word_count()
+        with self.metrics.timer('repeat_check'):
+            # Before appending, so the line isn't found repeating itself
+            repeats = self.phrases.check(text) if self.phrases else ()
+        with self.metrics.timer('save_text'):
+            words_before = self.store.words
+            self.store.append(text)
+            self.metrics.committed(self.store.words - words_before,
+                                   len(text.encode('utf-8')) + 1, self.store.size)
+            try:
+                self.get_history().record(self.current_manuscript, self.store.words - words_before)
+            except OSError:
+                # The history is a convenience; the text itself is safe
+                pass
+            self.save_status.setText('Saving...')
+            self.set_last_sentence(text, repeats)
+            self.update_word_count()
+            self.update_goal_status()
+
+    def set_last_sentence(self, text, repeats=()):
+        """Show the last line, highlighting `repeats` from PhraseIndex.check()."""
+        if not repeats:
+            self.last_sentence.setTextFormat(Qt.PlainText)
+            self.last_sentence.setText(text)
+            self.last_sentence.setToolTip('')
+            return
+        color = THEMES[self.current_theme]['repeat']
+        parts = []
+        notes = []
+        end = 0
+        for start, stop, ago in repeats:
+            parts.append(html.escape(text[end:start]))
+            parts.append(f'<span style="background-color: {color};">{html.escape(text[start:stop])}</span>')
+            where = "earlier in this line" if ago == 0 else f"{plural(ago, 'line')} ago"
+            notes.append(f"\u201c{text[start:stop]}\u201d: {where}")
+            end = stop
+        parts.append(html.escape(text[end:]))
+        self.last_sentence.setTextFormat(Qt.RichText)
+        self.last_sentence.setText(''.join(parts))
+        self.last_sentence.setToolTip("Repeated:\n" + "\n".join(notes))
+
+    def get_catalog(self):
+        """The manuscript catalog for the current save location."""
+        if self.catalog is None or self.catalog.save_dir != self.save_dir:
+            self.catalog = ManuscriptCatalog(self.save_dir)
+        return self.catalog
+
+    def get_history(self):
+        """The writing history for the current save location."""
+        if self.history is None or self.history.save_dir != self.save_dir:
+            if self.history:
+                self.history.close()
+            self.history = HistoryStore(self.save_dir)
+            self.streak = None
+        return self.history
+
+    def get_search_index(self):
+        """The search index for the current save location."""
+        if self.search_index is None or self.search_index.save_dir != self.save_dir:
+            self.search_index = SearchIndex(self.save_dir)
+        return self.search_index
+
+    def index_for_search(self, everything=False):
+        """Index newly saved text of the current (or every) manuscript on the search thread.
+
+        Requests made while an update is still queued are folded into it.
+        """
+        if (self.search_pending and not everything) or self.search_cancel.is_set():
+            return
+        self.search_pending = True
+        path = self.manuscript_path(self.current_manuscript) if self.current_manuscript else None
+        self.search_pool.submit(self.run_search_update, self.get_search_index(), path, everything)
+
+    def run_search_update(self, index, path, everything):
+        # Cleared first, so text committed while this runs queues another update
+        self.search_pending = False
+        try:
+            if everything:
+                index.update_all(self.search_cancel)
+            elif path:
+                index.update(path, self.search_cancel)
+        except (OSError, sqlite3.Error):
+            # Search is a convenience; the next update tries again
+            pass
+
+    def load_phrases(self, renamed=False):
+        """Swap in the current manuscript's repeated-phrase index once it is ready.
+
+        The previous index is saved (and moved along with the manuscript if
+        it was `renamed`) on the phrase thread before the new one loads.
+        """
+        self.phrase_generation += 1
+        old, self.phrases = self.phrases, None
+        if self.phrase_cancel.is_set():
+            return
+        path = None
+        if self.current_manuscript and self.phrase_words > 0:
+            path = self.manuscript_path(self.current_manuscript)
+        self.phrase_pool.submit(self.run_phrase_load, self.phrase_generation, old, path, renamed)
+
+    def run_phrase_load(self, generation, old, path, renamed):
+        try:
+            if old:
+                if renamed and path:
+                    old.rename(path)
+                old.save()
+            if path is None or generation != self.phrase_generation:
+                return
+            if old and old.path == path and old.phrase_words == self.phrase_words:
+                old.extend(self.phrase_cancel)
+                index = old
+            else:
+                index = PhraseIndex(path, self.phrase_words).load()
+        except OSError:
+            # Repeats simply aren't flagged until the next manuscript load
+            return
+        self.phrases_ready.emit(generation, index)
+
+    def on_phrases_ready(self, generation, index):
+        if generation == self.phrase_generation:
+            self.phrases = index
+
+    def update_phrases(self):
+        """Add newly saved lines to the phrase index on the phrase thread."""
+        if self.phrases is None or self.phrase_pending or self.phrase_cancel.is_set():
+            return
+        self.phrase_pending = True
+        self.phrase_pool.submit(self.run_phrase_update, self.phrases)
+
+    def run_phrase_update(self, index):
+        # Cleared first, so text committed while this runs queues another update
+        self.phrase_pending = False
+        try:
+            index.extend(self.phrase_cancel)
+        except OSError:
+            # The next update tries again
+            pass
+
+    def close_store(self):
+        """Commit pending text and stop the manuscript's background writer."""
+        if self.store:
+            self.store.close()
+
+    def on_durable_changed(self, seq):
+        if self.store and self.store.writer and seq >= self.store.writer.submitted:
+            self.save_status.setText('Saved')
+            self.save_status.setToolTip('')
+        self.index_for_search()
+        self.update_phrases()
+        if self.scrollback.isVisible():
+            scrollbar = self.scrollback.verticalScrollBar()
+            at_bottom = scrollbar.value() == scrollbar.maximum()
+            self.scrollback_model.refresh()
+            if at_bottom:
+                self.scrollback.scrollToBottom()
+
+    def on_write_failed(self, message):
+        self.save_status.setText('Save failed, retrying...')
+        self.save_status.setToolTip(message)
+
+    def closeEvent(self, event):
+        self.close_store()
+        if self.export_thread:
+            # Don't leave a half-written export behind
+            self.export_cancel.set()
+            self.export_thread.join()
+        self.scrollback_model.close()
+        self.scrollback_model.pool.shutdown(wait=True, cancel_futures=True)
+        if self.history:
+            self.history.close()
+        # Indexing stops at its next batch; what it finished is kept
+        self.search_cancel.set()
+        self.search_pool.shutdown(wait=True, cancel_futures=True)
+        self.phrase_cancel.set()
+        self.phrase_pool.shutdown(wait=True, cancel_futures=True)
+        if self.phrases:
+            self.phrases.save()
+        self.banners.close()
+        # Saves the last note and style prompt
+        self.banner_writer.close()
+        if self.metrics_file:
+            try:
+                self.metrics.export(Path(self.metrics_file).expanduser())
+            except OSError:
+                pass
+        super().closeEvent(event)
+
+    def init_file_watcher(self):
+        """Watch the manuscript and config files for changes made elsewhere."""
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.file_watcher.directoryChanged.connect(self.on_file_changed)
+        # Our own saves trigger it too, so bursts are handled once
+        self.file_sync_timer = QTimer(self)
+        self.file_sync_timer.setSingleShot(True)
+        self.file_sync_timer.setInterval(FILE_SYNC_DELAY_MS)
+        self.file_sync_timer.timeout.connect(self.sync_external_changes)
+        self.watch_files()
+
+    def watch_files(self):
+        """Point the watcher at the current files.
+
+        Files that don't exist yet are noticed through their folder, and
+        files replaced by renaming (as many editors save) are watched again.
+        """
+        paths = [BASHOUTRC, CONFIG_FILE]
+        if self.store:
+            paths.append(self.store.write_path)
+        wanted = {str(path if path.exists() else path.parent) for path in paths}
+        watched = set(self.file_watcher.files() + self.file_watcher.directories())
+        if watched - wanted:
+            self.file_watcher.removePaths(list(watched - wanted))
+        if wanted - watched:
+            self.file_watcher.addPaths(list(wanted - watched))
+
+    def on_file_changed(self, path):
+        self.changed_paths.add(Path(path))
+        self.file_sync_timer.start()
+
+    def sync_external_changes(self):
+        """Apply changes other programs made to the watched files."""
+        changed, self.changed_paths = self.changed_paths, set()
+        self.watch_files()
+        if BASHOUTRC in changed or BASHOUTRC.parent in changed:
+            self.reload_bashoutrc()
+        if CONFIG_FILE in changed or CONFIG_FILE.parent in changed:
+            self.reload_config()
+        if self.store and self.store.sync():
+            self.starting_word_count = self.store.starting_words
+            self.set_last_sentence(self.store.last_line)
+            self.update_word_count()
+            self.index_for_search()
+            self.update_phrases()
+            if self.scrollback.isVisible():
+                self.scrollback_model.refresh()
+
+    def reload_bashoutrc(self):
+        """Apply the ~/.bashoutrc settings that changed since they were last read."""
+        old, new = self.bashoutrc, read_bashoutrc()
+        self.bashoutrc = new
+        changed = {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
+        if 'GUI_THEME' in changed and new.get('GUI_THEME', 'light') in THEMES:
+            if new.get('GUI_THEME', 'light') != self.current_theme:
+                self.toggle_theme()
+        # A bad value keeps the current setting until the file is fixed
+        if 'GUI_FONT_SIZE' in changed:
+            self.font_size.setValue(rc_int(new, 'GUI_FONT_SIZE', 12, self.font_size.value()))
+        if changed & {'GUI_FSYNC', 'GUI_FSYNC_INTERVAL_MS'}:
+            fsync_policy = new.get('GUI_FSYNC', 'interval')
+            if fsync_policy not in FSYNC_POLICIES:
+                fsync_policy = self.fsync_policy
+            interval_ms = rc_int(new, 'GUI_FSYNC_INTERVAL_MS', 500, round(self.fsync_interval * 1000))
+            fsync_interval = max(interval_ms, 0) / 1000
+            if self.store:
+                self.store.set_fsync_policy(fsync_policy, fsync_interval)
+            self.fsync_policy, self.fsync_interval = fsync_policy, fsync_interval
+        if 'GUI_BANNER_ROTATE_SEC' in changed:
+            self.banner_rotate = rc_int(new, 'GUI_BANNER_ROTATE_SEC', 0, self.banner_rotate)
+            if self.banner_rotate > 0:
+                self.banner_timer.start(min(self.banner_rotate * 1000, MAX_TIMER_MS))
+            else:
+                self.banner_timer.stop()
+        if 'GUI_SNAPSHOT_INTERVAL_MIN' in changed:
+            self.snapshot_interval = rc_int(new, 'GUI_SNAPSHOT_INTERVAL_MIN', 60, self.snapshot_interval)
+            if self.snapshot_interval > 0:
+                self.snapshot_timer.start(min(self.snapshot_interval * 60 * 1000, MAX_TIMER_MS))
+            else:
+                self.snapshot_timer.stop()
+        if 'DEFAULT_BANNER' in changed:
+            self.default_banner = BANNER_STYLES.get(new.get('DEFAULT_BANNER', '1'), 'Quote')
+            self.banner_style.setCurrentText(self.default_banner)
+        if changed & {'QUOTES_FILES', 'BANNER_FILES'}:
+            self.reload_banners()
+        if 'GUI_METRICS_FILE' in changed:
+            self.metrics_file = new.get('GUI_METRICS_FILE')
+        if 'GUI_REPEAT_WORDS' in changed:
+            # A bad value keeps the current setting until the file is fixed
+            phrase_words = repeat_words(new, self.phrase_words)
+            if phrase_words != self.phrase_words:
+                self.phrase_words = phrase_words
+                if self.store:
+                    self.load_phrases()
+        if 'DAILY_WORD_GOAL' in changed:
+            self.daily_goal = daily_goal(new)
+            self.streak = None
+            if self.store:
+                self.update_goal_status()
+
+    def reload_config(self):
+        """Follow a save location or manuscript changed in ~/.bashout_config.json."""
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return
+        save_dir = Path(config.get('save_dir', str(self.save_dir)))
+        current_manuscript = config.get('current_manuscript')
+        if (save_dir, current_manuscript) == (self.save_dir, self.current_manuscript):
+            return
+        self.save_dir = save_dir
+        self.current_manuscript = current_manuscript
+        self.load_initial_state()
 
     def update_word_count(self):
-        self.total_word_count = self.count_words(self.SAVE_FILE)
-        self.session_word_count = self.total_word_count - self.starting_word_count
-        self.word_count.setText(f"[{self.session_word_count}/{self.total_word_count}]")
+        with self.metrics.timer('word_count'):
+            self.total_word_count = self.store.words
+            self.session_word_count = self.total_word_count - self.starting_word_count
+            self.word_count.setText(f"[{self.session_word_count}/{self.total_word_count}]")
+
+    def update_goal_status(self):
+        """Show today's words across all manuscripts, against the goal, and the streak."""
+        total = self.get_history().history()
+        today = datetime.date.today().toordinal()
+        words = total.words_on(today)
+        met = words >= max(self.daily_goal, 1)
+        if self.streak is None or self.streak[:2] != (today, met):
+            self.streak = (today, met, streaks(total, self.daily_goal, today)[0])
+        status = f"Today: {words}/{self.daily_goal}" if self.daily_goal else f"Today: {words}"
+        if self.streak[2]:
+            status += f" \u00b7 {self.streak[2]}-day streak"
+        self.goal_status.setText(status)
+
+    def search_manuscripts(self):
+        """Search every manuscript and go to the chosen line."""
+        self.index_for_search(everything=True)
+        dialog = SearchDialog(self.get_search_index(), self.current_manuscript, self)
+        if dialog.exec_() == QDialog.Accepted:
+            result = dialog.selected_result()
+            if result:
+                self.show_line(*result)
+
+    def show_line(self, name, line):
+        """Open manuscript `name` and scroll the scrollback to `line` (1-based)."""
+        if name != self.current_manuscript:
+            self.switch_manuscript(name)
+        if not self.scrollback.isVisible():
+            self.toggle_scrollback()
+        # The scrollback of a segmented manuscript starts after its sealed segments
+        row = line - 1 - (self.store.segments.sealed_lines if self.store.segments else 0)
+        if self.scrollback_model.loading:
+            self.scrollback_row = row
+        else:
+            self.scroll_scrollback_to(row)
+
+    def show_history(self):
+        """Chart words per day, with the daily goal and streaks."""
+        HistoryDialog(self.get_history(), self.current_manuscript, self.daily_goal,
+                      THEMES[self.current_theme], self).exec_()
 
     def add_sentence(self):
-        new_sentence = self.input_field.toPlainText().strip()
-        if new_sentence:
-            self.save_text(new_sentence)
-            self.input_field.clear()
+        with self.metrics.timer('add_sentence'):
+            new_sentence = self.input_field.toPlainText().strip()
+            if new_sentence:
+                self.save_text(new_sentence)
+                self.input_field.clear()
+
+    def toggle_metrics_overlay(self):
+        visible = not self.metrics_overlay.isVisible()
+        self.metrics_overlay.setVisible(visible)
+        if visible:
+            self.update_metrics_overlay()
+            self.metrics_timer.start()
+        else:
+            self.metrics_timer.stop()
+
+    def toggle_scrollback(self):
+        visible = not self.scrollback.isVisible()
+        self.scrollback.setVisible(visible)
+        if visible:
+            self.show_scrollback_lines()
+        else:
+            self.scrollback_model.set_path(None)
+
+    def show_scrollback_lines(self):
+        self.scrollback_row = None
+        self.scrollback_model.set_path(self.store.write_path if self.store else None)
+
+    def on_scrollback_ready(self):
+        row, self.scrollback_row = self.scrollback_row, None
+        # The view only sizes its scroll range for the new rows on its next layout
+        self.scrollback.doItemsLayout()
+        self.scroll_scrollback_to(row)
+
+    def scroll_scrollback_to(self, row=None):
+        """Centre the scrollback on `row`, or go to the bottom if it is None."""
+        if row is None:
+            self.scrollback.scrollToBottom()
+        elif 0 <= row < self.scrollback_model.rowCount():
+            self.scrollback.scrollTo(self.scrollback_model.index(row), QAbstractItemView.PositionAtCenter)
+
+    def update_metrics_overlay(self):
+        self.metrics_overlay.setText(self.metrics.format_overlay())
+
+    def export_metrics(self):
+        """Save the session metrics as JSON or CSV."""
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Session Metrics",
+            str(self.save_dir / 'bashout-metrics.json'),
+            "JSON (*.json);;CSV (*.csv)"
+        )
+        if path:
+            try:
+                self.metrics.export(path)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Failed to export metrics: {str(e)}")
 
     def on_banner_style_changed(self, style):
-        if style == 'Quote':
-            self.banner.setText(self.get_random_quote())
-        elif style == 'Note':
-            self.banner.setText(self.get_note())
-        elif style == 'Prompt':
-            self.banner.setText(self.get_style_prompt())
+        """Ask for a banner; it is shown when on_banner_ready gets it."""
+        if style not in self.banners.providers:
+            return
+        self.banner_request += 1
+        request = self.banner_request
+        self.banners.request(style, lambda text: self.banner_ready.emit(request, text))
+
+    def on_banner_ready(self, request, text):
+        # Ignore banners for a style that has since been changed
+        if request == self.banner_request:
+            self.banner.setText(text)
+
+    def rotate_banner(self):
+        self.on_banner_style_changed(self.banner_style.currentText())
+
+    def edit_note(self):
+        """Change the note shown by the Note banner style."""
+        note = self.banners.providers['Note']
+        text, ok = QInputDialog.getText(self, "Edit Note", "Note:", QLineEdit.Normal, note.last_known)
+        if ok:
+            note.set_note(text)
+            if self.banner_style.currentText() == 'Note':
+                self.on_banner_style_changed('Note')
+            else:
+                self.banner_style.setCurrentText('Note')
+
+    def reload_banners(self):
+        """Rebuild the banner providers after QUOTES_FILES or BANNER_FILES changed."""
+        self.banners.close()
+        self.banners = BannerService(default_providers(self.banner_writer, config=self.bashoutrc))
+        current = self.banner_style.currentText()
+        self.banner_style.blockSignals(True)
+        self.banner_style.clear()
+        self.banner_style.addItems(self.banners.names)
+        self.banner_style.setCurrentText(current if current in self.banners.providers else 'Quote')
+        self.banner_style.blockSignals(False)
+        self.on_banner_style_changed(self.banner_style.currentText())
 
     def update_input_font(self, size):
         current_font = self.input_field.font()
         current_font.setPointSize(size)
         self.input_field.setFont(current_font)
 
-    def count_words(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-                return len(text.split())
-        except Exception:
-            return 0
-
-    def get_random_quote(self):
-        quotes_file = RESOURCE_DIR / "quotes.txt"
-        if quotes_file.exists():
-            with open(quotes_file, 'r', encoding='utf-8') as f:
-                quotes = [q.strip() for q in f if q.strip()]
-                if quotes:
-                    return random.choice(quotes)
-        return "No quotes available."
-
-    def get_note(self):
-        note_file = RESOURCE_DIR / "note.txt"
-        if note_file.exists():
-            with open(note_file, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        return "No note available."
-
-    def get_style_prompt(self):
-        voicelist = ["formal", "informal", "conversational", "professional", "academic", 
-                    "playful", "sarcastic", "intimate", "detached"]
-        tonelist = ["light-hearted", "serious", "dark", "humorous", "whimsical", 
-                    "melancholic", "uplifting", "suspenseful", "nostalgic"]
-        tenselist = ["past", "present", "future"]
-        povlist = ["first-person", "second-person", "third-person (limited)", 
-                    "third-person (omniscient)"]
-        pacelist = ["fast", "slow", "steadily", "frenetically"]
-        style = (f"Create a {random.choice(tonelist)}, {random.choice(pacelist)}-paced story "
-                f"with a {random.choice(voicelist)} voice in {random.choice(tenselist)}-tense "
-                f"from a {random.choice(povlist)} point of view.")
-        style_file = RESOURCE_DIR / "style.txt"
-        with open(style_file, 'w', encoding='utf-8') as f:
-            f.write(style)
-        return style
-
     def show_manuscript_menu(self):
         """Show manuscript management menu when title is clicked."""
         menu = QMenu(self)
@@ -481,17 +1451,185 @@ class BashOutWindow(QMainWindow):
         new_action = menu.addAction("New Manuscript (Cmd+N)")
         new_action.triggered.connect(self.create_new_manuscript)
         
+        open_action = menu.addAction("Open Manuscript... (Cmd+O)")
+        open_action.triggered.connect(self.open_manuscript)
+        
         rename_action = menu.addAction("Rename Manuscript (Cmd+R)")
         rename_action.triggered.connect(self.rename_current_manuscript)
         
+        search_action = menu.addAction("Search Manuscripts... (Cmd+F)")
+        search_action.triggered.connect(self.search_manuscripts)
+        
         menu.addSeparator()
         
         change_location_action = menu.addAction("Change Save Location...")
         change_location_action.triggered.connect(self.choose_save_location)
         
+        menu.addSeparator()
+        
+        export_action = menu.addAction("Export Manuscript...")
+        export_action.triggered.connect(self.export_current_manuscript)
+        
+        export_all_action = menu.addAction("Export All Manuscripts...")
+        export_all_action.triggered.connect(self.export_all_manuscripts)
+        
+        note_action = menu.addAction("Edit Note...")
+        note_action.triggered.connect(self.edit_note)
+        
+        snapshot_action = menu.addAction("Take Snapshot")
+        snapshot_action.triggered.connect(self.take_snapshot)
+        
+        menu.addSeparator()
+        
+        scrollback_action = menu.addAction("Show Scrollback")
+        scrollback_action.setCheckable(True)
+        scrollback_action.setChecked(self.scrollback.isVisible())
+        scrollback_action.triggered.connect(self.toggle_scrollback)
+        
+        metrics_action = menu.addAction("Show Session Metrics")
+        metrics_action.setCheckable(True)
+        metrics_action.setChecked(self.metrics_overlay.isVisible())
+        metrics_action.triggered.connect(self.toggle_metrics_overlay)
+        
+        export_metrics_action = menu.addAction("Export Session Metrics...")
+        export_metrics_action.triggered.connect(self.export_metrics)
+        
+        history_action = menu.addAction("Writing History...")
+        history_action.triggered.connect(self.show_history)
+        
         # Show menu below the title button
         menu.exec_(self.title_button.mapToGlobal(self.title_button.rect().bottomLeft()))
 
+    def init_snapshots(self):
+        """Snapshot the current manuscript every GUI_SNAPSHOT_INTERVAL_MIN minutes."""
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.timeout.connect(self.take_snapshot)
+        if self.snapshot_interval > 0:
+            self.snapshot_timer.start(min(self.snapshot_interval * 60 * 1000, MAX_TIMER_MS))
+
+    def take_snapshot(self, wait=False):
+        """Snapshot the current manuscript on a background thread.
+
+        Unchanged manuscripts cost a hash of the file and add nothing.
+        """
+        if not self.current_manuscript:
+            return
+        if self.snapshot_thread and self.snapshot_thread.is_alive():
+            if not wait:
+                return
+            self.snapshot_thread.join()
+        self.snapshot_thread = threading.Thread(
+            target=self.run_snapshot,
+            args=(SnapshotStore(self.save_dir), self.manuscript_path(self.current_manuscript),
+                  self.current_manuscript),
+            name='bashout-snapshot', daemon=True)
+        self.snapshot_thread.start()
+        if wait:
+            self.snapshot_thread.join()
+
+    def run_snapshot(self, snapshots, path, name):
+        try:
+            snapshots.snapshot(path, name)
+        except (OSError, SnapshotError):
+            # Writing comes first; the next snapshot will try again
+            pass
+
+    def manuscript_path(self, name):
+        """The file (or segmented folder) holding manuscript `name`."""
+        segmented = self.save_dir / f"{name}{SEGMENT_SUFFIX}"
+        return segmented if segmented.is_dir() else self.save_dir / f"{name}.txt"
+
+    def export_current_manuscript(self):
+        if not self.store:
+            return
+        self.store.flush()
+        self.start_export([self.manuscript_path(self.current_manuscript)], self.current_manuscript)
+
+    def export_all_manuscripts(self):
+        """Export every manuscript in the save location as one book, a chapter each."""
+        try:
+            names = sorted(entry['name'] for entry in self.get_catalog().list())
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to list manuscripts: {str(e)}")
+            return
+        if self.store:
+            self.store.flush()
+        self.start_export([self.manuscript_path(name) for name in names], self.save_dir.name)
+
+    def start_export(self, paths, default_name):
+        """Ask where to export to, then export on a background thread."""
+        if self.export_thread and self.export_thread.is_alive():
+            QMessageBox.information(self, "Export", "An export is already running.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export",
+            str(self.save_dir / f"{default_name}.epub"),
+            "EPUB (*.epub);;HTML (*.html);;Markdown (*.md)"
+        )
+        if not path:
+            return
+        self.export_cancel.clear()
+        self.export_dialog = QProgressDialog("Exporting...", "Cancel", 0, 1000, self)
+        self.export_dialog.setWindowTitle("Export")
+        self.export_dialog.setMinimumDuration(500)
+        self.export_dialog.canceled.connect(self.export_cancel.set)
+        paragraphs = self.bashoutrc.get('EXPORT_PARAGRAPHS', 'auto')
+        self.export_thread = threading.Thread(
+            target=self.run_export, args=(paths, path, paragraphs), name='bashout-export', daemon=True)
+        self.export_thread.start()
+
+    def run_export(self, paths, path, paragraphs):
+        """Export thread: report progress in thousandths, then the outcome."""
+        last = -1
+
+        def progress(done, total):
+            nonlocal last
+            permille = done * 1000 // max(total, 1)
+            if permille != last:
+                last = permille
+                self.export_progress.emit(permille)
+
+        try:
+            export(paths, path, paragraphs=paragraphs, progress=progress,
+                   cancelled=self.export_cancel.is_set)
+        except ExportCancelled:
+            self.export_finished.emit('')
+        except (OSError, ValueError) as e:
+            self.export_finished.emit(f"Failed to export: {str(e)}")
+        else:
+            self.export_finished.emit('')
+
+    def on_export_progress(self, permille):
+        if self.export_dialog:
+            self.export_dialog.setValue(permille)
+
+    def on_export_finished(self, error):
+        if self.export_dialog:
+            self.export_dialog.reset()
+            self.export_dialog = None
+        if error:
+            QMessageBox.warning(self, "Error", error)
+
+    def open_manuscript(self):
+        """Switch to another manuscript in the save location."""
+        try:
+            entries = self.get_catalog().list()
+        except Exception as e:
+            QMessageBox.warning(self, "Error", f"Failed to list manuscripts: {str(e)}")
+            return
+        dialog = ManuscriptSwitcher(entries, self.current_manuscript, self)
+        if dialog.exec_() == QDialog.Accepted:
+            name = dialog.selected_name()
+            if name and name != self.current_manuscript:
+                self.switch_manuscript(name)
+
+    def switch_manuscript(self, name):
+        """Make `name` the current manuscript and load it."""
+        self.current_manuscript = name
+        self.save_config()
+        self.load_initial_state()
+
     def rename_current_manuscript(self):
         """Rename the current manuscript."""
         if not self.current_manuscript:
@@ -507,23 +1645,38 @@ class BashOutWindow(QMainWindow):
         )
         
         if ok and new_name and new_name != old_name:
-            old_file = self.save_dir / f"{old_name}.txt"
-            new_file = self.save_dir / f"{new_name}.txt"
-            
-            if new_file.exists():
-                QMessageBox.warning(
-                    self,
-                    "Error",
-                    f"A manuscript named '{new_name}' already exists."
-                )
+            if not valid_manuscript_name(new_name):
+                self.warn_invalid_name(new_name)
                 return
-                
+            # Keep a copy to go back to should the rename go wrong
+            self.store.flush()
+            self.take_snapshot(wait=True)
             try:
-                old_file.rename(new_file)
+                self.store.rename(new_name)
                 self.current_manuscript = new_name
-                self.SAVE_FILE = new_file
+                try:
+                    self.get_history().rename(old_name, new_name)
+                except OSError:
+                    # Only the chart loses track of the old days
+                    pass
+                try:
+                    self.get_search_index().rename(old_name, new_name)
+                except sqlite3.Error:
+                    # Indexed afresh under the new name instead
+                    pass
+                self.load_phrases(renamed=True)
+                if self.scrollback.isVisible():
+                    self.scrollback_model.rename(self.store.write_path)
+                if self.file_watcher:
+                    self.watch_files()
                 self.save_config()
                 self.title_button.setText(new_name)
+            except FileExistsError:
+                QMessageBox.warning(
+                    self,
+                    "Error",
+                    f"A manuscript named '{new_name}' already exists."
+                )
             except Exception as e:
                 QMessageBox.warning(
                     self,
@@ -531,20 +1684,42 @@ class BashOutWindow(QMainWindow):
                     f"Failed to rename manuscript: {str(e)}"
                 )
 
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="BashOut GUI")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print a phase-by-phase startup timing breakdown and exit")
+    parser.add_argument('--startup-target-ms', type=float,
+                        help="with --profile-startup, exit with status 1 if startup took longer")
+    args, qt_args = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    app = QApplication([sys.argv[0]] + qt_args)
+    
+    # Set application style
+    app.setStyle('Fusion')
+    
+    # Create and show the main window
+    window = BashOutWindow()
+    window.show()
+    startup_profile.mark('show')
+
+    if args.profile_startup:
+        def report():
+            print(startup_profile.report())
+            over = args.startup_target_ms is not None and startup_profile.total_ms > args.startup_target_ms
+            if args.startup_target_ms is not None:
+                print(f"target: {args.startup_target_ms:.1f} ms ({'exceeded' if over else 'met'})")
+            window.close()
+            app.exit(1 if over else 0)
+        window.startup_finished.connect(report)
+    
+    return app.exec_()
+
 if __name__ == '__main__':
     try:
-        app = QApplication(sys.argv)
-        
-        # Set application style
-        app.setStyle('Fusion')
-        
-        # Create and show the main window
-        window = BashOutWindow()
-        window.show()
-        
-        sys.exit(app.exec_())
+        sys.exit(main())
     except Exception as e:
         print("\nError: An unexpected error occurred.")
         print("Please make sure you have Python 3.6 or later installed.")
         print(f"Error details: {str(e)}")
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
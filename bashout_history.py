@@ -0,0 +1,247 @@
+"""Per-day writing history, goals and streaks.
+
+Every line committed in the GUI adds its words to today's record for the
+manuscript, and to a combined record for the whole save location. Records
+are fixed-width (day, words, lines) and kept in day order, one file per
+manuscript: today's record is rewritten in place and a new day appends
+one, so a year of history is about 4 KiB and loads straight into arrays.
+Charts and streaks never touch the manuscripts themselves.
+
+    python3 bashout_history.py                    # the last 30 days, all manuscripts
+    python3 bashout_history.py NAME --days 365 --goal 500
+
+Everything lives in `<save_dir>/.bashout_history/`: `<name>.days` per
+manuscript and `.all.days` for the save location as a whole. The goal
+comes from DAILY_WORD_GOAL in ~/.bashoutrc unless --goal is given.
+"""
+import argparse
+import datetime
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from bashout_engine import default_save_dir, read_bashoutrc
+
+HISTORY_DIR = '.bashout_history'
+HISTORY_SUFFIX = '.days'
+# Manuscript names never start with a dot (see valid_manuscript_name), so
+# this can't clash with one
+TOTAL_NAME = '.all'
+# Day (proleptic Gregorian ordinal, as date.toordinal()), words, lines
+RECORD = struct.Struct('<III')
+
+class WritingHistory:
+    """Per-day words and lines for one manuscript, in a fixed-width file.
+
+    `days`, `words` and `lines` are parallel arrays in day order, with
+    only the days something was written. Records are written as they
+    change, without fsync: losing the last moments of history in a crash
+    costs a little on a chart, unlike losing manuscript text.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.days = array('I')
+        self.words = array('I')
+        self.lines = array('I')
+        self._file = None
+
+    def __len__(self):
+        return len(self.days)
+
+    def load(self):
+        """Read the whole file; a torn record at the end is ignored."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        records = array('I', data[:len(data) - len(data) % RECORD.size])
+        if sys.byteorder == 'big':
+            records.byteswap()
+        self.days = records[0::3]
+        self.words = records[1::3]
+        self.lines = records[2::3]
+        return self
+
+    def record(self, words, lines=1, day=None):
+        """Add `words` and `lines` written on `day` (default: today)."""
+        day = day or datetime.date.today().toordinal()
+        if self.days and day <= self.days[-1]:
+            # Same day, or the clock went back: keep the file in day order
+            self.words[-1] += words
+            self.lines[-1] += lines
+        else:
+            self.days.append(day)
+            self.words.append(words)
+            self.lines.append(lines)
+        self._write(len(self.days) - 1)
+
+    def words_on(self, day=None):
+        day = day or datetime.date.today().toordinal()
+        if self.days and self.days[-1] == day:
+            return self.words[-1]
+        i = bisect_left(self.days, day)
+        return self.words[i] if i < len(self.days) and self.days[i] == day else 0
+
+    def daily(self, first, last):
+        """Words per day from `first` to `last` (ordinals), zeros included."""
+        words = array('I', bytes(4 * max(last - first + 1, 0)))
+        for i in range(bisect_left(self.days, first), len(self.days)):
+            if self.days[i] > last:
+                break
+            words[self.days[i] - first] = self.words[i]
+        return words
+
+    def merge(self, other):
+        """Add another history's records into this one, in memory."""
+        totals = dict(zip(self.days, zip(self.words, self.lines)))
+        for day, words, lines in zip(other.days, other.words, other.lines):
+            old_words, old_lines = totals.get(day, (0, 0))
+            totals[day] = (old_words + words, old_lines + lines)
+        days = sorted(totals)
+        self.days = array('I', days)
+        self.words = array('I', (totals[d][0] for d in days))
+        self.lines = array('I', (totals[d][1] for d in days))
+
+    def save(self):
+        """Rewrite the whole file atomically."""
+        self.close()
+        records = array('I')
+        for record in zip(self.days, self.words, self.lines):
+            records.extend(record)
+        if sys.byteorder == 'big':
+            records.byteswap()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(records.tobytes())
+        tmp.replace(self.path)
+
+    def rename(self, new_path):
+        self.close()
+        if self.path.exists():
+            self.path.replace(new_path)
+        self.path = Path(new_path)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, i):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'r+b' if self.path.exists() else 'w+b')
+        self._file.seek(i * RECORD.size)
+        self._file.write(RECORD.pack(self.days[i], self.words[i], self.lines[i]))
+        self._file.flush()
+
+class HistoryStore:
+    """Writing histories for the manuscripts in a save directory.
+
+    `record(name, words)` updates both the manuscript's history and the
+    save location's total. Histories are loaded once and kept open.
+    """
+
+    def __init__(self, save_dir):
+        self.save_dir = Path(save_dir)
+        self.root = self.save_dir / HISTORY_DIR
+        self._histories = {}
+
+    def history(self, name=None):
+        """The history of manuscript `name`, or of all of them if None."""
+        name = TOTAL_NAME if name is None else name
+        history = self._histories.get(name)
+        if history is None:
+            history = WritingHistory(self.root / f"{name}{HISTORY_SUFFIX}").load()
+            if name == TOTAL_NAME and not history.path.exists():
+                self._rebuild_total(history)
+            self._histories[name] = history
+        return history
+
+    def record(self, name, words, lines=1, day=None):
+        day = day or datetime.date.today().toordinal()
+        # Load the total first: if it has to be rebuilt, it mustn't see this record twice
+        total = self.history()
+        self.history(name).record(words, lines, day)
+        total.record(words, lines, day)
+
+    def rename(self, old_name, new_name):
+        history = self._histories.pop(old_name, None)
+        if history is None:
+            history = WritingHistory(self.root / f"{old_name}{HISTORY_SUFFIX}")
+        history.rename(self.root / f"{new_name}{HISTORY_SUFFIX}")
+        self._histories[new_name] = history.load()
+
+    def close(self):
+        for history in self._histories.values():
+            history.close()
+        self._histories.clear()
+
+    def _rebuild_total(self, total):
+        """Combine the manuscripts' histories, e.g. after .all.days was deleted."""
+        if not self.root.is_dir():
+            return
+        for path in sorted(self.root.glob(f"*{HISTORY_SUFFIX}")):
+            if not path.name.startswith('.'):
+                total.merge(WritingHistory(path).load())
+        if total.days:
+            total.save()
+
+def streaks(history, goal=0, today=None):
+    """(current, longest) runs of consecutive days meeting the goal.
+
+    A day counts if at least `goal` words were written, or any words if
+    there is no goal. The current streak is still alive if today's goal
+    hasn't been met yet but yesterday's was.
+    """
+    today = today or datetime.date.today().toordinal()
+    longest = run = 0
+    previous = None
+    for day, words in zip(history.days, history.words):
+        if day > today:
+            break
+        if words >= max(goal, 1):
+            run = run + 1 if previous == day - 1 else 1
+            previous = day
+            longest = max(longest, run)
+    current = run if previous is not None and previous >= today - 1 else 0
+    return current, longest
+
+def daily_goal(config=None):
+    """DAILY_WORD_GOAL from ~/.bashoutrc, or 0 for no goal."""
+    config = read_bashoutrc() if config is None else config
+    try:
+        return max(int(config.get('DAILY_WORD_GOAL', 0)), 0)
+    except ValueError:
+        return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily word counts, goals and streaks.")
+    parser.add_argument('name', nargs='?', help="manuscript (default: all manuscripts)")
+    parser.add_argument('--save-dir', type=Path, default=None,
+                        help="save location holding the history (default: the GUI's)")
+    parser.add_argument('--days', type=int, default=30, help="days to show (default: 30)")
+    parser.add_argument('--goal', type=int, default=None,
+                        help="daily word goal (default: DAILY_WORD_GOAL in ~/.bashoutrc)")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore((args.save_dir or default_save_dir()).expanduser())
+    history = store.history(args.name)
+    goal = daily_goal() if args.goal is None else args.goal
+    today = datetime.date.today().toordinal()
+    first = today - max(args.days, 1) + 1
+    for offset, words in enumerate(history.daily(first, today)):
+        day = datetime.date.fromordinal(first + offset)
+        mark = '*' if goal and words >= goal else ' '
+        print(f"{day.isoformat()}  {words:>7} {mark}")
+    current, longest = streaks(history, goal, today)
+    print(f"Goal: {goal or 'none'}  Current streak: {current} days  Longest: {longest} days  "
+          f"Total: {sum(history.words)} words")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Session metrics for BashOut's keystroke-to-disk hot path.
+
+SessionMetrics collects per-stage latency histograms (keypress, save,
+word count, disk write, fsync...), counters for lines, words and bytes
+committed, and the session's words per minute. It has no Qt dependency,
+is safe to update from the writer thread, and exports to JSON or CSV.
+"""
+import csv
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Histogram buckets grow by 5%, from 1 microsecond up to about 10 minutes
+BUCKET_GROWTH = 1.05
+BUCKET_MIN_SECONDS = 1e-6
+BUCKET_COUNT = 420
+SLOW_THRESHOLD_SECONDS = 0.016
+SLOW_SAMPLES_KEPT = 1000
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant memory.
+
+    Percentiles are accurate to the 5% bucket width, however many samples
+    are recorded.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds <= BUCKET_MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = int(math.log(seconds / BUCKET_MIN_SECONDS, BUCKET_GROWTH)) + 1
+        self.buckets[min(bucket, BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Approximate `p`th percentile (0-100) in seconds."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                upper = BUCKET_MIN_SECONDS * BUCKET_GROWTH ** bucket
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        """Count, mean, p50/p95/p99 and max, in milliseconds."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+class SessionMetrics:
+    """Latencies and counters for one writing session.
+
+    Stages are timed with `timer(stage)` or `record(stage, seconds)`;
+    nested stages are inclusive. Samples slower than 16 ms are also kept
+    (the most recent 1000) with the manuscript size at the time, so stalls
+    can be matched against manuscript growth.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms = {}
+        self.lines = 0
+        self.words = 0
+        self.bytes = 0
+        self.manuscript_bytes = 0
+        self.slow_samples = deque(maxlen=SLOW_SAMPLES_KEPT)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+            if seconds >= SLOW_THRESHOLD_SECONDS:
+                self.slow_samples.append({
+                    'time': time.time(),
+                    'stage': stage,
+                    'ms': seconds * 1000,
+                    'manuscript_bytes': self.manuscript_bytes,
+                })
+
+    def committed(self, words, nbytes, manuscript_bytes):
+        """Count one committed line of `words` words and `nbytes` bytes."""
+        with self._lock:
+            self.lines += 1
+            self.words += words
+            self.bytes += nbytes
+            self.manuscript_bytes = manuscript_bytes
+
+    @property
+    def words_per_minute(self):
+        minutes = (time.time() - self.started) / 60
+        return self.words / minutes if minutes > 0 else 0.0
+
+    def to_dict(self):
+        with self._lock:
+            stages = {stage: h.summary() for stage, h in self.histograms.items()}
+            slow = list(self.slow_samples)
+        return {
+            'started': self.started,
+            'duration_s': time.time() - self.started,
+            'lines': self.lines,
+            'words': self.words,
+            'bytes': self.bytes,
+            'words_per_minute': self.words_per_minute,
+            'manuscript_bytes': self.manuscript_bytes,
+            'stages': stages,
+            'slow_samples': slow,
+        }
+
+    def format_overlay(self):
+        """Short multi-line summary for an on-screen overlay."""
+        data = self.to_dict()
+        lines = [f"{data['words']} words  {data['lines']} lines  {data['bytes']} bytes  "
+                 f"{data['words_per_minute']:.1f} wpm"]
+        for stage, s in sorted(data['stages'].items()):
+            lines.append(f"{stage:<12} n={s['count']:<6} p50 {s['p50_ms']:.2f}  "
+                         f"p95 {s['p95_ms']:.2f}  p99 {s['p99_ms']:.2f} ms")
+        return '\n'.join(lines)
+
+    def export(self, path):
+        """Write the metrics to `path`: CSV for .csv files, JSON otherwise."""
+        path = str(path)
+        data = self.to_dict()
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+                for stage, s in sorted(data['stages'].items()):
+                    writer.writerow([stage, s['count'], f"{s['mean_ms']:.4f}", f"{s['p50_ms']:.4f}",
+                                     f"{s['p95_ms']:.4f}", f"{s['p99_ms']:.4f}", f"{s['max_ms']:.4f}"])
+                for key in ('lines', 'words', 'bytes', 'words_per_minute', 'manuscript_bytes'):
+                    writer.writerow([key, data[key]])
+        else:
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
@@ -0,0 +1,316 @@
+"""Repeated-phrase detection for the manuscript being written.
+
+PhraseIndex remembers every run of N consecutive words (4 by default) in
+roughly the last 130,000 words of a manuscript, as 64-bit rolling hashes
+in a fixed-size open-addressing table, so memory use doesn't grow with
+the book. `check(line)` finds the phrases in a new line that were already
+used in that window, in a few microseconds per word; `extend()` adds the
+text appended to the manuscript since the last call.
+
+The phrases are saved in a sidecar (`.<name>.txt.phrases` next to the
+manuscript, at most 2 MiB) along with the size and a fingerprint of the
+text indexed, so reopening a manuscript only reads what was appended
+since. Without a usable sidecar only the end of the manuscript is read,
+since older phrases would fall outside the window anyway.
+
+    python3 bashout_phrases.py MANUSCRIPT "A line to check for repeats."
+"""
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from pathlib import Path
+
+from bashout_engine import FINGERPRINT_SIZE, iter_manuscript_chunks, manuscript_size
+
+DEFAULT_PHRASE_WORDS = 4
+# Phrases remembered; a power of two. About the last 130,000 words
+DEFAULT_WINDOW = 1 << 17
+# Without a sidecar, read this many bytes per phrase from the end of the
+# manuscript: a phrase starts at every word, and prose averages about six
+# bytes a word with its space
+REBUILD_BYTES_PER_PHRASE = 8
+# Lines indexed between releases of the lock, so check() never waits long
+EXTEND_BATCH_LINES = 256
+
+MASK64 = (1 << 64) - 1
+HASH_BASE = 0x100000001b3
+
+_WORD = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+
+def words(text):
+    """(start, end, normalized word) for each word in `text`."""
+    return [(m.start(), m.end(), m.group().lower().replace('’', "'"))
+            for m in _WORD.finditer(text)]
+
+def phrase_hashes(tokens, n):
+    """Rolling hash of each run of `n` consecutive words, never 0."""
+    if len(tokens) < n:
+        return []
+    top = pow(HASH_BASE, n - 1, 1 << 64)
+    word_hashes = [zlib.crc32(word.encode('utf-8')) + 1 for _, _, word in tokens]
+    h = 0
+    for w in word_hashes[:n]:
+        h = (h * HASH_BASE + w) & MASK64
+    hashes = [h or 1]
+    for i in range(n, len(word_hashes)):
+        h = ((h - word_hashes[i - n] * top) * HASH_BASE + word_hashes[i]) & MASK64
+        hashes.append(h or 1)
+    return hashes
+
+class PhraseIndex:
+    """The last `window` N-word phrases of a manuscript, for spotting repeats.
+
+    Phrases are numbered in the order written; a ring buffer holds the
+    hash and line of the last `window` of them and a hash table maps each
+    hash to its latest number. When a phrase leaves the ring it leaves the
+    table too, unless it was used again since. All methods are safe to
+    call from several threads.
+    """
+
+    VERSION = 1
+    HEADER = struct.Struct(f'<HHIQQQH{FINGERPRINT_SIZE}s')
+
+    def __init__(self, path, phrase_words=DEFAULT_PHRASE_WORDS, window=DEFAULT_WINDOW):
+        self.path = Path(path)
+        self.phrase_words = phrase_words
+        self.window = window
+        self.lock = threading.Lock()
+        self._reset()
+
+    @property
+    def sidecar(self):
+        return self.path.with_name(f".{self.path.name}.phrases")
+
+    def check(self, text):
+        """Repeated phrases in `text` as (start, end, lines ago), merged where they overlap.
+
+        `lines ago` is how many lines back the phrase was last used (0 for
+        earlier in `text` itself).
+        """
+        tokens = words(text)
+        hashes = phrase_hashes(tokens, self.phrase_words)
+        spans = []
+        seen = {}
+        with self.lock:
+            for i, h in enumerate(hashes):
+                number = self._find(h)
+                if number is not None:
+                    ago = self.lines - self.ring_lines[number & (self.window - 1)] + 1
+                elif h in seen:
+                    ago = 0
+                else:
+                    seen[h] = i
+                    continue
+                start, end = tokens[i][0], tokens[i + self.phrase_words - 1][1]
+                if spans and start <= spans[-1][1]:
+                    spans[-1] = (spans[-1][0], end, min(spans[-1][2], ago))
+                else:
+                    spans.append((start, end, ago))
+        return spans
+
+    def extend(self, cancelled=None):
+        """Index the lines appended to the manuscript since the last call.
+
+        Returns the number of lines added. A manuscript that shrank or was
+        replaced is indexed again from its last part. Stops early once the
+        `cancelled` threading.Event is set.
+        """
+        size = manuscript_size(self.path)
+        with self.lock:
+            if size < self.size or not self._fingerprint_matches():
+                self._reset()
+            if not self.size:
+                self.size = self._rebuild_start(size)
+            start = self.size
+        added = 0
+        batch = []
+        pending = b''
+        offset = start
+        for chunk in iter_manuscript_chunks(self.path, start=start):
+            data = pending + chunk
+            cut = data.rfind(b'\n') + 1
+            complete, pending = data[:cut], data[cut:]
+            for raw in complete.split(b'\n')[:-1]:
+                batch.append(raw)
+                if len(batch) >= EXTEND_BATCH_LINES:
+                    offset = self._add_lines(batch, offset)
+                    added += len(batch)
+                    batch = []
+                    if cancelled is not None and cancelled.is_set():
+                        return added
+        # A last line without its newline yet is added once it is finished
+        self._add_lines(batch, offset)
+        return added + len(batch)
+
+    def load(self):
+        """Read the sidecar if it still describes this manuscript, then extend()."""
+        try:
+            with open(self.sidecar, 'rb') as f:
+                fields = self.HEADER.unpack(f.read(self.HEADER.size))
+                version, phrase_words, window, size, lines, count, fp_len, fingerprint = fields
+                if (version, phrase_words, window) == (self.VERSION, self.phrase_words, self.window):
+                    used = min(count, window)
+                    ring_hashes, ring_lines = array('Q'), array('Q')
+                    for a in (ring_hashes, ring_lines):
+                        a.fromfile(f, used)
+                        if sys.byteorder == 'big':
+                            a.byteswap()
+                        a.extend(bytes(8 * (window - used)))
+                    with self.lock:
+                        self._reset()
+                        self.ring_hashes, self.ring_lines = ring_hashes, ring_lines
+                        self.size, self.lines, self.count = size, lines, count
+                        self.fingerprint = fingerprint[:fp_len]
+                        # The table is rebuilt from the ring, oldest phrase first
+                        for number in range(count - used, count):
+                            self._store(ring_hashes[number & (window - 1)], number)
+        except (OSError, EOFError, struct.error):
+            # Rebuilt from the manuscript instead
+            pass
+        self.extend()
+        return self
+
+    def save(self):
+        """Write the sidecar atomically: the ring only, as the table follows from it."""
+        with self.lock:
+            header = self.HEADER.pack(self.VERSION, self.phrase_words, self.window, self.size,
+                                      self.lines, self.count, len(self.fingerprint), self.fingerprint)
+            tmp = self.sidecar.with_name(self.sidecar.name + '.tmp')
+            try:
+                with open(tmp, 'wb') as f:
+                    f.write(header)
+                    used = min(self.count, self.window)
+                    for a in (self.ring_hashes, self.ring_lines):
+                        a = a[:used]
+                        if sys.byteorder == 'big':
+                            a.byteswap()
+                        a.tofile(f)
+                tmp.replace(self.sidecar)
+            except OSError:
+                # Rebuilt next time; the manuscript is what matters
+                tmp.unlink(missing_ok=True)
+
+    def rename(self, new_path):
+        """Move the sidecar along with its renamed manuscript."""
+        with self.lock:
+            old_sidecar = self.sidecar
+            self.path = Path(new_path)
+            try:
+                old_sidecar.replace(self.sidecar)
+            except OSError:
+                pass
+
+    def _add_lines(self, lines, offset):
+        """Index complete lines (bytes, without newlines) that start at `offset`."""
+        with self.lock:
+            for raw in lines:
+                self.lines += 1
+                for h in phrase_hashes(words(raw.decode('utf-8', errors='replace')), self.phrase_words):
+                    self._add(h)
+                offset += len(raw) + 1
+                self.fingerprint = (self.fingerprint + raw + b'\n')[-FINGERPRINT_SIZE:]
+            self.size = offset
+        return offset
+
+    def _add(self, h):
+        window = self.window
+        slot = self.count & (window - 1)
+        if self.count >= window:
+            # The oldest phrase leaves the window, unless it was used since
+            old = self.ring_hashes[slot]
+            if self._find(old) == self.count - window:
+                self._delete(old)
+        self.ring_hashes[slot] = h
+        self.ring_lines[slot] = self.lines
+        self._store(h, self.count)
+        self.count += 1
+
+    def _find(self, h):
+        """The latest number of phrase hash `h`, or None."""
+        keys = self.keys
+        mask = len(keys) - 1
+        i = h & mask
+        while keys[i]:
+            if keys[i] == h:
+                return self.numbers[i]
+            i = (i + 1) & mask
+        return None
+
+    def _store(self, h, number):
+        keys = self.keys
+        mask = len(keys) - 1
+        i = h & mask
+        while keys[i] and keys[i] != h:
+            i = (i + 1) & mask
+        keys[i] = h
+        self.numbers[i] = number
+
+    def _delete(self, h):
+        """Remove `h`, shifting later entries back so lookups still find them."""
+        keys, numbers = self.keys, self.numbers
+        mask = len(keys) - 1
+        i = h & mask
+        while keys[i] != h:
+            i = (i + 1) & mask
+        j = i
+        while True:
+            j = (j + 1) & mask
+            if not keys[j]:
+                break
+            home = keys[j] & mask
+            # Move keys[j] into the hole at i unless its home lies in (i, j]
+            if (j > i and (home <= i or home > j)) or (j < i and home <= i and home > j):
+                keys[i], numbers[i] = keys[j], numbers[j]
+                i = j
+        keys[i] = 0
+        numbers[i] = 0
+
+    def _fingerprint_matches(self):
+        if not self.size:
+            return True
+        start = self.size - len(self.fingerprint)
+        before = b''
+        for chunk in iter_manuscript_chunks(self.path, FINGERPRINT_SIZE, start=start):
+            before += chunk
+            if len(before) >= len(self.fingerprint):
+                break
+        return before[:len(self.fingerprint)] == self.fingerprint
+
+    def _rebuild_start(self, size):
+        """Offset of the first whole line in the part of the manuscript worth indexing."""
+        start = size - self.window * REBUILD_BYTES_PER_PHRASE
+        if start <= 0:
+            return 0
+        for chunk in iter_manuscript_chunks(self.path, start=start - 1):
+            newline = chunk.find(b'\n')
+            if newline >= 0:
+                return start + newline
+            start += len(chunk)
+        return size
+
+    def _reset(self):
+        # Twice as many slots as phrases keeps probe sequences short
+        self.keys = array('Q', bytes(16 * self.window))
+        self.numbers = array('Q', bytes(16 * self.window))
+        self.ring_hashes = array('Q', bytes(8 * self.window))
+        self.ring_lines = array('Q', bytes(8 * self.window))
+        self.size = self.lines = self.count = 0
+        self.fingerprint = b''
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: bashout_phrases.py MANUSCRIPT LINE", file=sys.stderr)
+        return 2
+    index = PhraseIndex(argv[0]).load()
+    index.save()
+    for start, end, ago in index.check(argv[1]):
+        where = "earlier in this line" if ago == 0 else f"{ago} lines ago"
+        print(f"{argv[1][start:end]!r}: {where}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
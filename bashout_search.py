@@ -0,0 +1,300 @@
+"""Full-text search across the manuscripts in a save directory.
+
+Every line of every manuscript is indexed in an SQLite FTS5 table (one
+per manuscript) in `<save_dir>/.bashout_search.sqlite3`. The tables are
+contentless: they hold the words and their positions but not the text,
+and matching lines are read back from the manuscripts, so the index stays
+well under the size of the text. Appended text is indexed from where the
+last update stopped, after checking that the bytes before it are
+unchanged; a manuscript that was shortened or replaced is indexed afresh.
+
+    python3 bashout_search.py rain                 # lines with "rain"
+    python3 bashout_search.py '"the old house"'    # an exact phrase
+    python3 bashout_search.py 'whisp* door'        # "door" and a word starting "whisp"
+
+All terms must appear in the line; case and accents are ignored. The
+index is brought up to date before searching, so text written with
+bashout.sh or another program is found as well.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from bashout_engine import (FINGERPRINT_SIZE, SEGMENT_SUFFIX, default_save_dir, iter_manuscript_chunks,
+                            manuscript_name, manuscript_size)
+
+SEARCH_FILE = '.bashout_search.sqlite3'
+SEARCH_VERSION = 1
+# A row id packs the line number above the line's byte offset, so a hit
+# gives both without storing anything per line: offsets up to 64 GiB and
+# 128M lines per manuscript
+OFFSET_BITS = 36
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+# Lines indexed per transaction; an interrupted update keeps what was committed
+BATCH_LINES = 20000
+DEFAULT_LIMIT = 100
+
+_TERM = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+
+def fts_query(text):
+    """An FTS5 query for `text`: words, "quoted phrases" and prefix* terms, all required.
+
+    Anything else FTS5 would treat as syntax is quoted, so any input is a
+    valid query. Returns '' if there is nothing to search for.
+    """
+    terms = []
+    for phrase, phrase_prefix, word in _TERM.findall(text):
+        term = phrase if not word else word.rstrip('*')
+        prefix = '*' if phrase_prefix or (word.endswith('*') and term) else ''
+        # Punctuation alone isn't indexed, so there'd be nothing to match
+        if re.search(r'\w', term):
+            terms.append('"' + term.replace('"', '""') + '"' + prefix)
+    return ' '.join(terms)
+
+@contextmanager
+def transaction(db):
+    """BEGIN IMMEDIATE ... COMMIT, rolled back if anything goes wrong."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+def read_line_at(path, offset):
+    """The line starting at byte `offset` of a plain or segmented manuscript, stripped."""
+    line = b''
+    for chunk in iter_manuscript_chunks(path, 8192, start=offset):
+        end = chunk.find(b'\n')
+        if end >= 0:
+            line += chunk[:end]
+            break
+        line += chunk
+    return line.decode('utf-8', errors='replace').strip()
+
+class SearchIndex:
+    """Word index of the manuscripts in a save directory.
+
+    `update(path)` indexes a manuscript's new lines; `update_all()` does
+    every manuscript and forgets deleted ones. `search(query)` returns
+    matching lines as dicts with the manuscript `name`, 1-based `line`
+    number and `text`. Safe to use from several threads: one can update
+    while another searches.
+    """
+
+    def __init__(self, save_dir):
+        self.save_dir = Path(save_dir)
+        self._local = threading.local()
+
+    @property
+    def path(self):
+        return self.save_dir / SEARCH_FILE
+
+    def manuscript_path(self, name):
+        segmented = self.save_dir / f"{name}{SEGMENT_SUFFIX}"
+        return segmented if segmented.is_dir() else self.save_dir / f"{name}.txt"
+
+    def update(self, path, cancelled=None):
+        """Index the lines added to a manuscript since the last update.
+
+        Returns the number of lines indexed. Stops early, keeping what is
+        done so far, once the `cancelled` threading.Event is set.
+        """
+        path = Path(path)
+        name = path.name[:-len(SEGMENT_SUFFIX)] if path.is_dir() else path.stem
+        size = manuscript_size(path)
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            table, offset, line, fingerprint = self._resume(db, name, path, size)
+            indexed = 0
+            if offset < size:
+                insert = f"INSERT INTO {table} (rowid, text) VALUES (?, ?)"
+                batch = []
+                pending = b''
+                for chunk in iter_manuscript_chunks(path, start=offset):
+                    data = pending + chunk
+                    cut = data.rfind(b'\n') + 1
+                    complete, pending = data[:cut], data[cut:]
+                    for raw in complete.split(b'\n')[:-1]:
+                        if raw.strip():
+                            batch.append(((line << OFFSET_BITS) | offset,
+                                          raw.decode('utf-8', errors='replace')))
+                        offset += len(raw) + 1
+                        line += 1
+                    fingerprint = (fingerprint + complete)[-FINGERPRINT_SIZE:]
+                    if len(batch) >= BATCH_LINES:
+                        db.executemany(insert, batch)
+                        indexed += len(batch)
+                        batch = []
+                        self._save_progress(db, name, offset, line, fingerprint)
+                        db.execute("COMMIT")
+                        if cancelled is not None and cancelled.is_set():
+                            return indexed
+                        db.execute("BEGIN IMMEDIATE")
+                db.executemany(insert, batch)
+                indexed += len(batch)
+                # A last line without its newline yet is indexed once it is finished
+                self._save_progress(db, name, offset, line, fingerprint)
+            db.execute("COMMIT")
+            return indexed
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+
+    def update_all(self, cancelled=None):
+        """Update every manuscript in the save directory and drop deleted ones."""
+        names = set()
+        with os.scandir(self.save_dir) as entries:
+            for entry in entries:
+                name = manuscript_name(entry)
+                if name is None:
+                    continue
+                names.add(name)
+                try:
+                    self.update(entry.path, cancelled)
+                except OSError:
+                    continue
+                if cancelled is not None and cancelled.is_set():
+                    return
+        with transaction(self._db()) as db:
+            for row in db.execute("SELECT id, name FROM manuscripts").fetchall():
+                if row['name'] not in names:
+                    self._drop(db, row['id'])
+
+    def rename(self, old_name, new_name):
+        with transaction(self._db()) as db:
+            db.execute("UPDATE manuscripts SET name = ? WHERE name = ?", (new_name, old_name))
+
+    def search(self, query, limit=DEFAULT_LIMIT, first=None):
+        """Up to `limit` matching lines, manuscript by manuscript, in the order written.
+
+        Manuscripts are searched alphabetically, except that manuscript
+        `first` (such as the one being written) comes before the rest.
+        """
+        expression = fts_query(query)
+        if not expression:
+            return []
+        db = self._db()
+        ids = {row['name']: row['id'] for row in db.execute("SELECT id, name FROM manuscripts")}
+        results = []
+        for name in sorted(ids, key=lambda name: (name != first, name)):
+            if len(results) >= limit:
+                break
+            table = f"lines_{ids[name]}"
+            rowids = [row[0] for row in db.execute(
+                f"SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rowid LIMIT ?",
+                (expression, limit - len(results)))]
+            if rowids:
+                results.extend(self._read_results(name, rowids))
+        return results
+
+    def _read_results(self, name, rowids):
+        path = self.manuscript_path(name)
+        results = []
+        try:
+            if path.is_dir():
+                texts = [read_line_at(path, rowid & OFFSET_MASK) for rowid in rowids]
+            else:
+                with open(path, 'rb') as f:
+                    texts = []
+                    for rowid in rowids:
+                        f.seek(rowid & OFFSET_MASK)
+                        texts.append(f.readline().decode('utf-8', errors='replace').strip())
+        except OSError:
+            # Deleted since it was indexed
+            return results
+        for rowid, text in zip(rowids, texts):
+            results.append({'name': name, 'line': (rowid >> OFFSET_BITS) + 1, 'text': text})
+        return results
+
+    def _resume(self, db, name, path, size):
+        """(table, offset, line, fingerprint) to continue indexing `name` from."""
+        row = db.execute("SELECT id, size, lines, fingerprint FROM manuscripts WHERE name = ?",
+                         (name,)).fetchone()
+        if row and row['size'] <= size:
+            start = max(row['size'] - FINGERPRINT_SIZE, 0)
+            before = b''
+            for chunk in iter_manuscript_chunks(path, FINGERPRINT_SIZE, start=start):
+                before += chunk
+                if len(before) >= row['size'] - start:
+                    break
+            if before[:row['size'] - start] == row['fingerprint']:
+                return f"lines_{row['id']}", row['size'], row['lines'], row['fingerprint']
+        if row:
+            self._drop(db, row['id'])
+        manuscript_id = db.execute(
+            "INSERT INTO manuscripts (name, size, lines, fingerprint) VALUES (?, 0, 0, ?)",
+            (name, b'')).lastrowid
+        # Contentless, and without per-row lengths since results aren't ranked
+        db.execute(f"CREATE VIRTUAL TABLE lines_{manuscript_id} USING fts5(text, content='', columnsize=0, "
+                   f"tokenize='unicode61 remove_diacritics 2')")
+        return f"lines_{manuscript_id}", 0, 0, b''
+
+    def _save_progress(self, db, name, offset, line, fingerprint):
+        db.execute("UPDATE manuscripts SET size = ?, lines = ?, fingerprint = ? WHERE name = ?",
+                   (offset, line, fingerprint, name))
+
+    def _drop(self, db, manuscript_id):
+        db.execute(f"DROP TABLE IF EXISTS lines_{manuscript_id}")
+        db.execute("DELETE FROM manuscripts WHERE id = ?", (manuscript_id,))
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+            # Transactions are managed explicitly, so updates can commit in batches
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            # It's an index that can be rebuilt, so don't fsync every commit
+            db.execute("PRAGMA synchronous=NORMAL")
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version != SEARCH_VERSION:
+                with transaction(db):
+                    for (table,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                               "AND name LIKE 'lines\\_%' ESCAPE '\\'").fetchall():
+                        db.execute(f"DROP TABLE IF EXISTS {table}")
+                    db.execute("DROP TABLE IF EXISTS manuscripts")
+                    db.execute("CREATE TABLE manuscripts (id INTEGER PRIMARY KEY, name TEXT UNIQUE, "
+                               "size INTEGER, lines INTEGER, fingerprint BLOB)")
+                    db.execute(f"PRAGMA user_version = {SEARCH_VERSION}")
+            self._local.db = db
+        return db
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search every BashOut manuscript for words or phrases.")
+    parser.add_argument('query', help='words, "exact phrases" and prefix* terms, all required')
+    parser.add_argument('--save-dir', type=Path, default=None,
+                        help="save location to search (default: the GUI's)")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f"most lines to show (default: {DEFAULT_LIMIT})")
+    parser.add_argument('--no-update', action='store_true',
+                        help="search the index as it is, without indexing new text first")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex((args.save_dir or default_save_dir()).expanduser())
+    try:
+        if not args.no_update:
+            index.update_all()
+        started = time.perf_counter()
+        results = index.search(args.query, args.limit)
+        elapsed = time.perf_counter() - started
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for result in results:
+        print(f"{result['name']}:{result['line']}: {result['text']}")
+    print(f"{len(results)} lines in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
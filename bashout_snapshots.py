@@ -0,0 +1,351 @@
+"""Deduplicated snapshots of manuscripts, stored in the save directory.
+
+Manuscripts are cut into chunks at content-defined points (after a line
+whose hash has its low bits clear, within a minimum and maximum size), and
+each chunk is stored once, compressed, under its SHA-256. A snapshot is a
+small manifest listing its chunks, so snapshotting a book that only grew
+stores roughly just the new text. The previous snapshot's chunks are
+checked against the file rather than re-chunked, so taking a snapshot
+costs a hash of the old text plus chunking of the new.
+
+    python3 bashout_snapshots.py snapshot [MANUSCRIPT...]   # all manuscripts by default
+    python3 bashout_snapshots.py list [NAME]
+    python3 bashout_snapshots.py restore SNAPSHOT_ID [-o FILE] [--force]
+    python3 bashout_snapshots.py gc [--keep N]
+
+Everything lives in `<save_dir>/.bashout_snapshots/`: `chunks/` holds the
+chunks, `snapshots/` one JSON manifest per snapshot and `index.jsonl` a
+one-line summary per snapshot for listing.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from bashout_engine import default_save_dir, iter_manuscript_chunks, manuscript_name
+
+SNAPSHOT_DIR = '.bashout_snapshots'
+
+# Chunks are cut after a line once they reach the minimum size and the
+# line's CRC has its low bits clear (about 1 line in 512), and always at
+# the maximum size. For typical prose that averages about 48 KiB.
+MIN_CHUNK_SIZE = 16 << 10
+MAX_CHUNK_SIZE = 256 << 10
+BOUNDARY_MASK = 511
+COMPRESS_LEVEL = 6
+
+class SnapshotError(Exception):
+    """A snapshot is missing or damaged."""
+
+class _ByteStream:
+    """Reads a manuscript's plain-text bytes by exact length or by line."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+        self.pos = 0
+
+    def read(self, n):
+        while len(self.buffer) - self.pos < n:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer = self.buffer[self.pos:] + chunk
+            self.pos = 0
+        data = self.buffer[self.pos:self.pos + n]
+        self.pos += len(data)
+        return data
+
+    def unread(self, data):
+        self.buffer = data + self.buffer[self.pos:]
+        self.pos = 0
+
+    def lines(self, limit):
+        """Yield lines (with their newline), none longer than `limit`."""
+        partial = self.buffer[self.pos:]
+        self.buffer = b''
+        self.pos = 0
+        for chunk in self.chunks:
+            lines = (partial + chunk).split(b'\n')
+            partial = lines.pop()
+            for line in lines:
+                line += b'\n'
+                while len(line) > limit:
+                    yield line[:limit]
+                    line = line[limit:]
+                yield line
+            while len(partial) > limit:
+                yield partial[:limit]
+                partial = partial[limit:]
+        if partial:
+            yield partial
+
+def content_defined_chunks(lines):
+    """Group lines into chunks whose boundaries depend only on nearby content."""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK_SIZE or (size >= MIN_CHUNK_SIZE
+                                      and zlib.crc32(line) & BOUNDARY_MASK == 0):
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+class SnapshotStore:
+    """The snapshots of every manuscript in one save directory."""
+
+    def __init__(self, save_dir):
+        self.save_dir = Path(save_dir)
+        self.root = self.save_dir / SNAPSHOT_DIR
+
+    @property
+    def index_path(self):
+        return self.root / 'index.jsonl'
+
+    def chunk_path(self, digest):
+        return self.root / 'chunks' / digest[:2] / digest
+
+    def manifest_path(self, snapshot_id):
+        return self.root / 'snapshots' / f"{snapshot_id}.json"
+
+    @contextmanager
+    def locked(self):
+        """Keep snapshots and garbage collection from running at once."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / 'lock', 'w') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def snapshot(self, path, name=None):
+        """Snapshot the plain or segmented manuscript at `path`.
+
+        Returns the new snapshot's summary, or the latest one unchanged if
+        the manuscript hasn't changed since.
+        """
+        path = Path(path)
+        name = name or manuscript_name(path) or path.stem
+        with self.locked():
+            previous = self.latest(name)
+            old_chunks = self.load_manifest(previous['id'])['chunks'] if previous else []
+            stream = _ByteStream(iter_manuscript_chunks(path))
+            chunks = []
+            # Chunks of the last snapshot still in place are reused as is;
+            # its final chunk was cut by the end of the file, so it is redone
+            for digest, length in old_chunks[:-1]:
+                data = stream.read(length)
+                if len(data) != length or hashlib.sha256(data).hexdigest() != digest:
+                    stream.unread(data)
+                    break
+                chunks.append([digest, length])
+            new_bytes = 0
+            for data in content_defined_chunks(stream.lines(MAX_CHUNK_SIZE)):
+                digest = hashlib.sha256(data).hexdigest()
+                if self._store_chunk(digest, data):
+                    new_bytes += len(data)
+                chunks.append([digest, len(data)])
+            if previous and chunks == old_chunks:
+                return previous
+            summary = {
+                'id': self._new_id(),
+                'name': name,
+                'created': time.time(),
+                'size': sum(length for _, length in chunks),
+                'chunks': len(chunks),
+                'new_bytes': new_bytes,
+            }
+            self._write_file(self.manifest_path(summary['id']),
+                             json.dumps(dict(summary, chunks=chunks)).encode('utf-8'))
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(summary) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        return summary
+
+    def list(self, name=None):
+        """Snapshot summaries, oldest first, optionally for one manuscript."""
+        try:
+            with open(self.index_path, 'r') as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        return [e for e in entries if name is None or e['name'] == name]
+
+    def latest(self, name):
+        entries = self.list(name)
+        return entries[-1] if entries else None
+
+    def load_manifest(self, snapshot_id):
+        try:
+            with open(self.manifest_path(snapshot_id), 'rb') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise SnapshotError(f"No snapshot {snapshot_id}") from None
+
+    def iter_snapshot(self, snapshot_id):
+        """Yield a snapshot's text chunk by chunk, checking each one."""
+        for digest, length in self.load_manifest(snapshot_id)['chunks']:
+            try:
+                with open(self.chunk_path(digest), 'rb') as f:
+                    data = zlib.decompress(f.read())
+            except (OSError, zlib.error) as e:
+                raise SnapshotError(f"Chunk {digest} is missing or damaged: {e}") from None
+            if len(data) != length or hashlib.sha256(data).hexdigest() != digest:
+                raise SnapshotError(f"Chunk {digest} is damaged")
+            yield data
+
+    def restore(self, snapshot_id, output=None, force=False):
+        """Write a snapshot's text to `output` and return the path.
+
+        By default it goes next to the manuscript as
+        `<name>.restored-<id>.txt`; an existing file is only replaced with
+        `force`, and only once the whole snapshot has been verified.
+        """
+        manifest = self.load_manifest(snapshot_id)
+        output = Path(output) if output else \
+            self.save_dir / f"{manifest['name']}.restored-{snapshot_id}.txt"
+        if output.exists() and not force:
+            raise FileExistsError(f"{output} already exists")
+        tmp = output.with_name(f".{output.name}.tmp")
+        try:
+            with open(tmp, 'wb') as f:
+                for data in self.iter_snapshot(snapshot_id):
+                    f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            tmp.replace(output)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return output
+
+    def delete(self, snapshot_ids):
+        """Forget snapshots; their chunks are freed by the next gc()."""
+        snapshot_ids = set(snapshot_ids)
+        with self.locked():
+            self._rewrite_index([e for e in self.list() if e['id'] not in snapshot_ids])
+            for snapshot_id in snapshot_ids:
+                self.manifest_path(snapshot_id).unlink(missing_ok=True)
+
+    def gc(self, keep=None):
+        """Delete chunks no snapshot uses, after keeping only the newest
+        `keep` snapshots of each manuscript if given.
+
+        Returns (snapshots deleted, chunks deleted, bytes freed).
+        """
+        with self.locked():
+            entries = self.list()
+            dropped = set()
+            if keep is not None:
+                by_name = {}
+                for entry in entries:
+                    by_name.setdefault(entry['name'], []).append(entry['id'])
+                for ids in by_name.values():
+                    dropped.update(ids[:max(len(ids) - keep, 0)])
+                self._rewrite_index([e for e in entries if e['id'] not in dropped])
+                for snapshot_id in dropped:
+                    self.manifest_path(snapshot_id).unlink(missing_ok=True)
+            live = set()
+            for entry in entries:
+                if entry['id'] not in dropped:
+                    live.update(digest for digest, _ in self.load_manifest(entry['id'])['chunks'])
+            chunks = freed = 0
+            chunk_dir = self.root / 'chunks'
+            if chunk_dir.is_dir():
+                for path in chunk_dir.glob('*/*'):
+                    if path.name not in live:
+                        freed += path.stat().st_size
+                        path.unlink()
+                        chunks += 1
+        return len(dropped), chunks, freed
+
+    def _store_chunk(self, digest, data):
+        """Store a chunk unless it is already there; True if it was new."""
+        path = self.chunk_path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_file(path, zlib.compress(data, COMPRESS_LEVEL))
+        return True
+
+    def _write_file(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(path)
+
+    def _rewrite_index(self, entries):
+        self._write_file(self.index_path,
+                         ''.join(json.dumps(e) + '\n' for e in entries).encode('utf-8'))
+
+    def _new_id(self):
+        snapshot_id = time.strftime('%Y%m%dT%H%M%S')
+        n = 1
+        while self.manifest_path(snapshot_id).exists():
+            n += 1
+            snapshot_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{n}"
+        return snapshot_id
+
+def find_manuscripts(save_dir):
+    with os.scandir(save_dir) as entries:
+        return sorted(Path(entry.path) for entry in entries if manuscript_name(entry) is not None)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicated snapshots of BashOut manuscripts.")
+    parser.add_argument('--save-dir', type=Path, default=None,
+                        help="save location holding the snapshots (default: the GUI's)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('snapshot', help="snapshot manuscripts (default: all in the save location)")
+    command.add_argument('manuscripts', nargs='*', type=Path)
+    command = commands.add_parser('list', help="list snapshots, oldest first")
+    command.add_argument('name', nargs='?')
+    command = commands.add_parser('restore', help="write a snapshot's text to a file")
+    command.add_argument('snapshot_id')
+    command.add_argument('-o', '--output', type=Path, default=None)
+    command.add_argument('--force', action='store_true', help="replace an existing output file")
+    command = commands.add_parser('gc', help="delete unused chunks")
+    command.add_argument('--keep', type=int, default=None,
+                         help="first delete all but the newest KEEP snapshots of each manuscript")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore((args.save_dir or default_save_dir()).expanduser())
+    try:
+        if args.command == 'snapshot':
+            for path in args.manuscripts or find_manuscripts(store.save_dir):
+                started = time.perf_counter()
+                s = store.snapshot(path)
+                print(f"{s['id']}\t{s['name']}\t{s['size']} bytes\t{s['new_bytes']} new\t"
+                      f"{time.perf_counter() - started:.2f} s")
+        elif args.command == 'list':
+            for s in store.list(args.name):
+                created = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(s['created']))
+                print(f"{s['id']}\t{s['name']}\t{created}\t{s['size']} bytes\t{s['new_bytes']} new")
+        elif args.command == 'restore':
+            print(store.restore(args.snapshot_id, args.output, args.force))
+        elif args.command == 'gc':
+            snapshots, chunks, freed = store.gc(args.keep)
+            print(f"Deleted {snapshots} snapshots and {chunks} chunks, freeing {freed} bytes")
+    except (OSError, SnapshotError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
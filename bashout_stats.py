@@ -0,0 +1,119 @@
+"""Word, line and byte statistics for every manuscript in a save directory.
+
+Manuscripts are streamed in fixed-size chunks (words split across chunks
+are counted once) and spread over a process pool, so a shared save_dir
+with thousands of manuscripts is counted at disk speed:
+
+    python3 bashout_stats.py                      # GUI save_dir and CLI SAVE_FILE
+    python3 bashout_stats.py ~/Writing --format csv --jobs 8
+
+Results go to stdout as JSON (default) or CSV; throughput in MB/s is part
+of the JSON output and printed to stderr for CSV.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bashout_engine import (CONFIG_FILE, DEFAULT_SAVE_DIR, count_words_in_chunks,
+                            iter_manuscript_chunks, manuscript_name, read_bashoutrc)
+
+DEFAULT_CLI_SAVE_FILE = Path.home() / 'Documents' / 'output.txt'
+
+def manuscript_stats(path):
+    """Words, lines and bytes of one plain or segmented manuscript."""
+    totals = {'lines': 0, 'bytes': 0}
+
+    def tallied():
+        for chunk in iter_manuscript_chunks(path):
+            totals['lines'] += chunk.count(b'\n')
+            totals['bytes'] += len(chunk)
+            yield chunk
+
+    try:
+        words = count_words_in_chunks(tallied())[0]
+    except OSError as e:
+        return {'path': str(path), 'error': str(e), 'words': 0, 'lines': 0, 'bytes': 0}
+    except (ValueError, KeyError) as e:
+        # A segmented manuscript whose manifest.json is corrupt or half-written
+        return {'path': str(path), 'error': f"Corrupt manifest: {e}", 'words': 0, 'lines': 0, 'bytes': 0}
+    return {'path': str(path), 'words': words, 'lines': totals['lines'], 'bytes': totals['bytes']}
+
+def default_sources():
+    """The GUI's save_dir and the CLI's SAVE_FILE, where they exist."""
+    config = read_bashoutrc()
+    save_file = Path(config.get('SAVE_FILE', str(DEFAULT_CLI_SAVE_FILE))).expanduser()
+    save_dir = save_file.parent if 'SAVE_FILE' in config else DEFAULT_SAVE_DIR
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            save_dir = Path(json.load(f).get('save_dir', str(save_dir)))
+    except (OSError, ValueError):
+        pass
+    return [p for p in (save_dir, save_file) if p.exists()]
+
+def find_manuscripts(sources):
+    """Manuscript paths under `sources` (directories or single files), deduplicated."""
+    found = {}
+    for source in sources:
+        source = Path(source).expanduser()
+        if source.is_dir() and not source.name.endswith('.bashout'):
+            with os.scandir(source) as entries:
+                for entry in entries:
+                    if manuscript_name(entry) is not None:
+                        found.setdefault(os.path.realpath(entry.path), Path(entry.path))
+        elif source.exists():
+            found.setdefault(os.path.realpath(source), source)
+    return sorted(found.values())
+
+def collect(paths, jobs=None):
+    """Stats for each path plus the aggregate, counted in a process pool."""
+    started = time.perf_counter()
+    if jobs == 1 or len(paths) < 2:
+        results = [manuscript_stats(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(manuscript_stats, paths,
+                                    chunksize=max(1, len(paths) // (4 * (jobs or os.cpu_count() or 1)))))
+    elapsed = time.perf_counter() - started
+    total = {key: sum(r[key] for r in results) for key in ('words', 'lines', 'bytes')}
+    total['manuscripts'] = len(results)
+    return {
+        'manuscripts': results,
+        'total': total,
+        'elapsed_s': elapsed,
+        'mb_per_s': total['bytes'] / (1 << 20) / elapsed if elapsed > 0 else 0.0,
+    }
+
+def write_csv(report, out):
+    writer = csv.writer(out)
+    writer.writerow(['path', 'words', 'lines', 'bytes', 'error'])
+    for r in report['manuscripts']:
+        writer.writerow([r['path'], r['words'], r['lines'], r['bytes'], r.get('error', '')])
+    total = report['total']
+    writer.writerow(['TOTAL', total['words'], total['lines'], total['bytes'], ''])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Word, line and byte counts for BashOut manuscripts.")
+    parser.add_argument('sources', nargs='*', type=Path,
+                        help="save directories or manuscript files (default: GUI save_dir and CLI SAVE_FILE)")
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    report = collect(find_manuscripts(args.sources or default_sources()), args.jobs)
+    if args.format == 'csv':
+        write_csv(report, sys.stdout)
+        print(f"{report['total']['bytes'] / (1 << 20):.1f} MB in {report['elapsed_s']:.2f} s "
+              f"({report['mb_per_s']:.1f} MB/s)", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Curses terminal front-end for BashOut.
+
+Behaves like the loop in bashout.sh (banner, last sentence and a
+[session/total] prompt, configured by the same ~/.bashoutrc keys), but
+runs on the in-process ManuscriptStore: word counts are incremental, the
+save file stays open, and no processes are spawned after startup.
+
+    python3 bashout_tui.py [1|2|3]
+"""
+import curses
+import sys
+import textwrap
+from pathlib import Path
+
+from bashout_engine import (ManuscriptStore, read_bashoutrc, get_random_quote,
+                            get_note, get_style_prompt, RESOURCE_DIR)
+
+DEFAULT_SAVE_FILE = Path.home() / 'Documents' / 'output.txt'
+
+# BANNER_COLOR names; bashout.sh uses the bright variants, hence A_BOLD
+BANNER_COLORS = {
+    'BLUE': curses.COLOR_BLUE,
+    'RED': curses.COLOR_RED,
+    'GREEN': curses.COLOR_GREEN,
+    'YELLOW': curses.COLOR_YELLOW,
+    'MAGENTA': curses.COLOR_MAGENTA,
+    'CYAN': curses.COLOR_CYAN,
+    'WHITE': curses.COLOR_WHITE,
+}
+
+def choose_banner(choice):
+    """Banner text for a menu choice, prompting first if there isn't one."""
+    if not choice:
+        print("Choose a banner style:")
+        print("1: Inspirational quote")
+        print("2: Note")
+        print("3: Style prompt")
+        choice = input().strip()
+    if choice == '1':
+        return get_random_quote()
+    if choice == '2':
+        note = input("Enter your note: ")
+        with open(RESOURCE_DIR / "note.txt", 'w', encoding='utf-8') as f:
+            f.write(note + '\n')
+        return get_note()
+    if choice == '3':
+        return get_style_prompt()
+    return "No banner available."
+
+class TerminalUI:
+    """Draws the writing screen and reads one line at a time."""
+
+    def __init__(self, screen, store, banner, banner_color):
+        self.screen = screen
+        self.store = store
+        self.banner = banner
+        self.banner_attr = curses.A_BOLD
+        if curses.has_colors():
+            curses.use_default_colors()
+            curses.init_pair(1, banner_color, -1)
+            self.banner_attr |= curses.color_pair(1)
+
+    def run(self):
+        while True:
+            line = self.read_line()
+            if line is None:
+                return
+            self.store.append(line)
+
+    def read_line(self):
+        """Edit a line until Enter; None on Ctrl-D with an empty line."""
+        buffer = []
+        while True:
+            self.draw(''.join(buffer))
+            try:
+                key = self.screen.get_wch()
+            except curses.error:
+                continue
+            if key in ('\n', '\r', curses.KEY_ENTER):
+                return ''.join(buffer)
+            if key == '\x04' and not buffer:
+                return None
+            if key in ('\x7f', '\b', curses.KEY_BACKSPACE):
+                if buffer:
+                    buffer.pop()
+            elif key == '\x15':  # Ctrl-U
+                buffer.clear()
+            elif isinstance(key, str) and key.isprintable():
+                buffer.append(key)
+
+    def draw(self, text):
+        height, width = self.screen.getmaxyx()
+        wrap = max(width - 1, 1)
+        self.screen.erase()
+        rows = [(line, self.banner_attr) for line in textwrap.wrap(self.banner, wrap)]
+        if self.store.last_line:
+            rows += [(line, curses.A_NORMAL) for line in textwrap.wrap(self.store.last_line, wrap)]
+        prompt = f"[{self.store.session_words}/{self.store.words}]: "
+        # Like a line edit, scroll so the end of the line (and the cursor) stays in view
+        room = max(wrap - len(prompt), 1)
+        if len(text) > room:
+            text = text[-room:]
+        try:
+            for y, (line, attr) in enumerate(rows[:max(height - 1, 0)]):
+                self.screen.addstr(y, 0, line, attr)
+            self.screen.addstr(min(len(rows), height - 1), 0, prompt + text)
+        except curses.error:
+            # Ran out of screen; the cursor is left wherever drawing stopped
+            pass
+        self.screen.refresh()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    config = read_bashoutrc()
+    save_file = Path(config.get('SAVE_FILE', str(DEFAULT_SAVE_FILE))).expanduser()
+    banner_color = BANNER_COLORS.get(config.get('BANNER_COLOR', 'BLUE'), curses.COLOR_BLUE)
+
+    try:
+        store = ManuscriptStore.for_file(save_file).open()
+    except OSError as e:
+        print(f"Error: Cannot create {save_file}: {e}")
+        return 1
+    try:
+        banner = choose_banner(argv[0] if argv else None)
+        curses.wrapper(lambda screen: TerminalUI(screen, store, banner, banner_color).run())
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        store.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Benchmarks for the headless manuscript engine (requires pytest-benchmark).
+
+Tracks append latency, open latency and word count throughput against
+synthetic manuscripts of increasing size; see conftest.py for options.
+"""
+from bashout_engine import ManuscriptStore, WordCountIndex, count_words
+
+SENTENCE = "She closed the door and listened to the rain for a long while."
+
+def open_store(path, **kwargs):
+    return ManuscriptStore(path.parent, path.stem, **kwargs).open()
+
+def test_append_latency(benchmark, manuscript_copy):
+    store = open_store(manuscript_copy)
+    try:
+        benchmark(store.append, SENTENCE)
+    finally:
+        store.close()
+
+def test_append_durable_latency(benchmark, manuscript_copy):
+    store = open_store(manuscript_copy, fsync_policy='line')
+
+    def append_and_flush():
+        store.append(SENTENCE)
+        store.flush()
+
+    try:
+        benchmark(append_and_flush)
+    finally:
+        store.close()
+
+def test_open_latency(benchmark, manuscript):
+    WordCountIndex(manuscript).refresh()  # warm sidecar, as on a normal launch
+    benchmark(lambda: open_store(manuscript).close())
+
+def test_open_latency_cold(benchmark, manuscript):
+    index = WordCountIndex(manuscript)
+
+    def open_without_sidecar():
+        index.sidecar.unlink(missing_ok=True)
+        open_store(manuscript).close()
+
+    benchmark(open_without_sidecar)
+
+def test_count_throughput(benchmark, manuscript):
+    size = manuscript.stat().st_size
+    benchmark(count_words, manuscript)
+    benchmark.extra_info['MB/s'] = size / (1 << 20) / benchmark.stats['mean']
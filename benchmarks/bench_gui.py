@@ -0,0 +1,230 @@
+"""Benchmark GUI latency offscreen, driven by synthetic keystrokes.
+
+Opens BashOutWindow on Qt's offscreen platform against synthetic
+manuscripts of increasing size and measures, until the affected widget
+has repainted:
+
+    keystroke  typing one character into the input field
+    return     pressing Return, until the word count label shows the new count
+    theme      toggle_theme(), which reapplies the stylesheet via apply_theme()
+    switch     switching to the manuscript from a small one
+
+Key events are sent to the input field with QApplication.sendEvent(), so
+they pass through BashOutWindow.eventFilter() exactly as real typing does.
+The window runs with HOME set to a temporary directory, so your own
+~/.bashoutrc, config and manuscripts are never touched.
+
+    python3 benchmarks/bench_gui.py
+    python3 benchmarks/bench_gui.py --sizes 1M 100M --json gui.json
+    python3 benchmarks/bench_gui.py --compare gui.json   # exit 1 on regressions
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from synthetic import parse_size, write_manuscript
+
+SENTENCE = "She closed the door and listened to the rain for a long while."
+METRICS = ('keystroke', 'return', 'theme', 'switch')
+PAINT_TIMEOUT = 5.0
+
+def summarize(samples):
+    """Summary statistics, in milliseconds, for a list of latencies in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {'n': 0}
+    return {
+        'n': len(ms),
+        'mean_ms': statistics.fmean(ms),
+        'median_ms': statistics.median(ms),
+        'p95_ms': ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+        'max_ms': ms[-1],
+    }
+
+def run_size(app, size_text, samples, scrollback, tmp):
+    # Imported here: bashout_engine reads HOME when it is first imported
+    from PyQt5.QtCore import QEvent, QObject, Qt
+    from PyQt5.QtGui import QKeyEvent
+    from bashout_gui import BashOutWindow
+
+    class PaintProbe(QObject):
+        """Records when a widget last painted."""
+
+        def __init__(self, widget):
+            super().__init__(widget)
+            self.painted = 0.0
+            widget.installEventFilter(self)
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                self.painted = time.perf_counter()
+            return False
+
+        def wait(self, since):
+            """Seconds from `since` until the next paint; None on timeout."""
+            while self.painted < since:
+                if time.perf_counter() - since > PAINT_TIMEOUT:
+                    return None
+                app.processEvents()
+            return self.painted - since
+
+    def wait_for(condition):
+        started = time.perf_counter()
+        while not condition():
+            if time.perf_counter() - started > PAINT_TIMEOUT:
+                raise RuntimeError("timed out waiting for the window")
+            app.processEvents()
+
+    def press(widget, key, text=''):
+        app.sendEvent(widget, QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, text))
+        app.sendEvent(widget, QKeyEvent(QEvent.KeyRelease, key, Qt.NoModifier, text))
+
+    def measure(probe, action, results):
+        started = time.perf_counter()
+        action()
+        latency = probe.wait(started)
+        if latency is None:
+            results['timeouts'] = results.get('timeouts', 0) + 1
+        else:
+            results['samples'].append(latency)
+
+    save_dir = tmp / 'manuscripts'
+    save_dir.mkdir(exist_ok=True)
+    path = save_dir / 'book.txt'
+    write_manuscript(path, parse_size(size_text))
+    with open(save_dir / 'scratch.txt', 'w', encoding='utf-8') as f:
+        f.write("A short manuscript to switch from.\n")
+    with open(tmp / '.bashout_config.json', 'w') as f:
+        json.dump({'save_dir': str(save_dir), 'current_manuscript': 'book'}, f)
+
+    started = time.perf_counter()
+    window = BashOutWindow()
+    finished = []
+    window.startup_finished.connect(lambda: finished.append(time.perf_counter()))
+    window.show()
+    wait_for(lambda: finished)
+    startup = finished[0] - started
+    if scrollback:
+        window.toggle_scrollback()
+    # Open the scratch manuscript once so its sidecars exist
+    window.switch_manuscript('scratch')
+    window.switch_manuscript('book')
+
+    input_probe = PaintProbe(window.input_field.viewport())
+    count_probe = PaintProbe(window.word_count)
+    results = {name: {'samples': []} for name in METRICS}
+    for _ in range(samples):
+        for ch in SENTENCE:
+            measure(input_probe, lambda: press(window.input_field, ord(ch.upper()), ch),
+                    results['keystroke'])
+        measure(count_probe, lambda: press(window.input_field, Qt.Key_Return),
+                results['return'])
+        measure(count_probe, window.toggle_theme, results['theme'])
+        window.switch_manuscript('scratch')
+        app.processEvents()
+        measure(count_probe, lambda: window.switch_manuscript('book'), results['switch'])
+
+    words = window.store.words
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+    metrics = {}
+    for name, result in results.items():
+        metrics[name] = summarize(result['samples'])
+        metrics[name]['timeouts'] = result.get('timeouts', 0)
+    return {
+        'size': size_text,
+        'bytes': path.stat().st_size,
+        'words': words,
+        'startup_ms': startup * 1000,
+        'metrics': metrics,
+    }
+
+def compare(report, baseline, tolerance):
+    """Lines describing medians more than `tolerance` slower than `baseline`."""
+    previous = {r['size']: r['metrics'] for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        for name, stats in result['metrics'].items():
+            old = previous.get(result['size'], {}).get(name, {}).get('median_ms')
+            new = stats.get('median_ms')
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{result['size']} {name}: {old:.2f} ms -> {new:.2f} ms "
+                                   f"(+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['1M', '10M', '100M'])
+    parser.add_argument('--samples', type=int, default=20,
+                        help="sentences typed (and themes toggled, manuscripts switched) per size")
+    parser.add_argument('--scrollback', action='store_true',
+                        help="measure with the scrollback pane shown")
+    parser.add_argument('--json', type=Path,
+                        help="write the report as JSON to this file ('-' for stdout)")
+    parser.add_argument('--compare', type=Path, metavar='BASELINE',
+                        help="exit with status 1 if a median is slower than in this JSON report")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="with --compare, allowed slowdown as a fraction (default: 0.25)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.environ['HOME'] = str(tmp)
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        with open(tmp / '.bashoutrc', 'w') as f:
+            # No snapshot timer or banner rotation firing mid-measurement
+            f.write("GUI_SNAPSHOT_INTERVAL_MIN: 0\nGUI_BANNER_ROTATE_SEC: 0\n")
+
+        from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication([sys.argv[0]])
+        app.setStyle('Fusion')
+
+        report = {
+            'platform': app.platformName(),
+            'python': platform.python_version(),
+            'qt': QT_VERSION_STR,
+            'pyqt': PYQT_VERSION_STR,
+            'machine': platform.machine(),
+            'samples': args.samples,
+            'scrollback': args.scrollback,
+            'results': [],
+        }
+        out = sys.stderr if args.json == Path('-') else sys.stdout
+        print(f"{'size':>8}  {'metric':<11}{'median (ms)':>13}{'p95 (ms)':>10}{'max (ms)':>10}", file=out)
+        for size_text in args.sizes:
+            result = run_size(app, size_text, args.samples, args.scrollback, tmp)
+            report['results'].append(result)
+            for name, stats in result['metrics'].items():
+                if stats['n']:
+                    print(f"{size_text:>8}  {name:<11}{stats['median_ms']:>13.2f}"
+                          f"{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}", file=out)
+                if stats['timeouts']:
+                    print(f"{size_text:>8}  {name:<11}{stats['timeouts']} repaint(s) timed out", file=out)
+
+    if args.json == Path('-'):
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
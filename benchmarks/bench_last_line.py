@@ -0,0 +1,61 @@
+"""Benchmark loading the last sentence of large manuscripts.
+
+Compares the old readlines() approach with read_last_line() over synthetic
+manuscripts of increasing size:
+
+    python3 benchmarks/bench_last_line.py
+    python3 benchmarks/bench_last_line.py --sizes 1M 100M
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bashout_engine import read_last_line
+from synthetic import parse_size, write_manuscript
+
+def readlines_last_line(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+        return lines[-1].strip() if lines else ''
+
+def measure(func, path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['1M', '100M', '1G'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-readlines', action='store_true',
+                        help="don't run the readlines() baseline")
+    args = parser.parse_args()
+
+    candidates = [('read_last_line', read_last_line)]
+    if not args.skip_readlines:
+        candidates.append(('readlines', readlines_last_line))
+
+    print(f"{'size':>8}  {'method':<16}{'best (ms)':>12}{'peak mem (KiB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_text in args.sizes:
+            path = os.path.join(tmp, 'manuscript.txt')
+            write_manuscript(path, parse_size(size_text))
+            for name, func in candidates:
+                best, peak = measure(func, path, args.repeat)
+                print(f"{size_text:>8}  {name:<16}{best * 1000:>12.3f}{peak / 1024:>16.1f}")
+            os.remove(path)
+
+if __name__ == '__main__':
+    main()
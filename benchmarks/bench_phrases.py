@@ -0,0 +1,37 @@
+"""Benchmarks for repeated-phrase detection (requires pytest-benchmark).
+
+Times checking a line against a manuscript's phrase index, which the GUI
+does on every commit, building the index with and without a sidecar, and
+extending it after appending a line; see conftest.py for options. Build
+time stops growing with size once the manuscript is longer than the
+window.
+"""
+import pytest
+
+from bashout_phrases import PhraseIndex
+
+SENTENCE = "She closed the door and listened to the rain for a long while."
+
+@pytest.fixture(scope='session')
+def phrase_index(manuscript):
+    return PhraseIndex(manuscript).load()
+
+@pytest.mark.parametrize('line', [SENTENCE, "the quick brown fox jumps over a lazy dog while rain falls"])
+def test_check(benchmark, phrase_index, line):
+    benchmark(phrase_index.check, line)
+
+def test_build(benchmark, manuscript_copy):
+    benchmark.pedantic(lambda: PhraseIndex(manuscript_copy).load(), rounds=3)
+
+def test_load_sidecar(benchmark, manuscript_copy):
+    PhraseIndex(manuscript_copy).load().save()
+    benchmark(lambda: PhraseIndex(manuscript_copy).load())
+
+def test_extend(benchmark, manuscript_copy):
+    index = PhraseIndex(manuscript_copy).load()
+
+    def append():
+        with open(manuscript_copy, 'a') as f:
+            f.write(SENTENCE + '\n')
+
+    benchmark.pedantic(index.extend, rounds=50, setup=append)
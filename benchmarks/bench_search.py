@@ -0,0 +1,47 @@
+"""Benchmarks for full-text search (requires pytest-benchmark).
+
+Indexes a synthetic manuscript once per size, then times word, phrase and
+prefix queries and the incremental update after appending a line, which
+is what the GUI does after each commit; see conftest.py for options. The
+synthetic text repeats a small vocabulary, so every word is common: real
+manuscripts query faster than this.
+"""
+import shutil
+
+import pytest
+
+from bashout_search import SearchIndex
+
+SENTENCE = "She closed the door and listened to the rain for a long while.\n"
+
+@pytest.fixture(scope='session')
+def search_index(manuscript, tmp_path_factory):
+    """A SearchIndex over a copy of `manuscript`, fully indexed."""
+    save_dir = tmp_path_factory.mktemp('search')
+    shutil.copyfile(manuscript, save_dir / manuscript.name)
+    index = SearchIndex(save_dir)
+    index.update_all()
+    return index
+
+def test_index_initial(benchmark, manuscript_copy):
+    index = SearchIndex(manuscript_copy.parent)
+    size = manuscript_copy.stat().st_size
+    benchmark.pedantic(index.update, args=(manuscript_copy,), rounds=1)
+    benchmark.extra_info['MB/s'] = size / (1 << 20) / benchmark.stats['mean']
+    benchmark.extra_info['index MB'] = sum(
+        p.stat().st_size for p in index.save_dir.glob(index.path.name + '*')) / (1 << 20)
+
+def test_index_append(benchmark, manuscript_copy):
+    index = SearchIndex(manuscript_copy.parent)
+    index.update(manuscript_copy)
+
+    def append():
+        with open(manuscript_copy, 'a') as f:
+            f.write(SENTENCE)
+
+    benchmark.pedantic(index.update, args=(manuscript_copy,), rounds=50, setup=append)
+
+@pytest.mark.parametrize('query', ['jumps', '"distant hills"', 'wri*', 'rain "old stories"'])
+def test_query(benchmark, search_index, query):
+    results = benchmark(search_index.search, query)
+    assert results
@@ -0,0 +1,31 @@
+"""Benchmarks for manuscript snapshots (requires pytest-benchmark).
+
+Compares a first snapshot, where the whole manuscript is chunked and
+stored, with a snapshot taken after appending a paragraph, which is what
+hourly snapshots of a growing book cost; see conftest.py for options.
+"""
+import shutil
+
+from bashout_snapshots import SnapshotStore
+
+PARAGRAPH = "She closed the door and listened to the rain for a long while.\n" * 20
+
+def test_snapshot_initial(benchmark, manuscript_copy):
+    snapshots = SnapshotStore(manuscript_copy.parent)
+    size = manuscript_copy.stat().st_size
+    benchmark.pedantic(snapshots.snapshot, args=(manuscript_copy,), rounds=3,
+                       setup=lambda: shutil.rmtree(snapshots.root, ignore_errors=True))
+    benchmark.extra_info['MB/s'] = size / (1 << 20) / benchmark.stats['mean']
+
+def test_snapshot_after_append(benchmark, manuscript_copy):
+    snapshots = SnapshotStore(manuscript_copy.parent)
+    snapshots.snapshot(manuscript_copy)
+
+    def append():
+        with open(manuscript_copy, 'a') as f:
+            f.write(PARAGRAPH)
+
+    summary = benchmark.pedantic(snapshots.snapshot, args=(manuscript_copy,), rounds=10, setup=append)
+    benchmark.extra_info['new_bytes'] = summary['new_bytes']
+    benchmark.extra_info['stored_bytes'] = sum(
+        p.stat().st_size for p in (snapshots.root / 'chunks').glob('*/*'))
@@ -0,0 +1,58 @@
+"""Word count kernel against str.split() and wc -w (requires pytest-benchmark).
+
+All counters read the manuscript in the same 1 MiB chunks. The str.split()
+variant is the decode-and-split approach the engine used before; wc -w and
+the awk fallback in bashout.sh run as subprocesses, so their times include
+process startup. See conftest.py for options.
+"""
+import codecs
+import shutil
+import subprocess
+
+import pytest
+
+from bashout_engine import READ_CHUNK_SIZE, count_words
+
+def count_words_str_split(path):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    words = 0
+    in_word = False
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            text = decoder.decode(chunk)
+            if text:
+                words += len(text.split()) - (in_word and not text[0].isspace())
+                in_word = not text[-1].isspace()
+    return words
+
+def count_words_wc(path):
+    result = subprocess.run(['wc', '-w', str(path)], env={'LC_ALL': 'C'},
+                            capture_output=True, check=True, text=True)
+    return int(result.stdout.split()[0])
+
+def count_words_bash_fallback(path):
+    script = ("LC_ALL=C tr '\\t\\v\\f\\r' '    ' < \"$1\" | "
+              "LC_ALL=C awk '{ n += NF } END { print n + 0 }'")
+    result = subprocess.run(['sh', '-c', script, 'sh', str(path)],
+                            capture_output=True, check=True, text=True)
+    return int(result.stdout)
+
+def run(benchmark, counter, manuscript):
+    words = benchmark(counter, manuscript)
+    benchmark.extra_info['words'] = words
+    benchmark.extra_info['MB/s'] = manuscript.stat().st_size / (1 << 20) / benchmark.stats['mean']
+    return words
+
+def test_kernel(benchmark, manuscript):
+    assert run(benchmark, count_words, manuscript) == len(manuscript.read_bytes().split())
+
+def test_str_split(benchmark, manuscript):
+    run(benchmark, count_words_str_split, manuscript)
+
+@pytest.mark.skipif(shutil.which('wc') is None, reason="wc not available")
+def test_wc(benchmark, manuscript):
+    run(benchmark, count_words_wc, manuscript)
+
+@pytest.mark.skipif(shutil.which('awk') is None, reason="awk not available")
+def test_bash_fallback(benchmark, manuscript):
+    assert run(benchmark, count_words_bash_fallback, manuscript) == count_words(manuscript)
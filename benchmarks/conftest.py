@@ -0,0 +1,41 @@
+"""pytest-benchmark fixtures: synthetic manuscripts of increasing size.
+
+    python3 -m pytest benchmarks/bench_engine.py
+    python3 -m pytest benchmarks/bench_engine.py --manuscript-sizes 1M 10M 100M
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import parse_size, write_manuscript
+
+DEFAULT_SIZES = ['1M', '10M', '100M']
+
+def pytest_addoption(parser):
+    parser.addoption('--manuscript-sizes', nargs='+', default=DEFAULT_SIZES,
+                     help="synthetic manuscript sizes to benchmark (e.g. 1M 100M 1G)")
+
+def pytest_generate_tests(metafunc):
+    if 'manuscript_size' in metafunc.fixturenames:
+        metafunc.parametrize('manuscript_size', metafunc.config.getoption('manuscript_sizes'),
+                             scope='session')
+
+@pytest.fixture(scope='session')
+def manuscript(manuscript_size, tmp_path_factory):
+    """Path to a synthetic manuscript of `manuscript_size` bytes."""
+    path = tmp_path_factory.mktemp(f'manuscript-{manuscript_size}') / 'book.txt'
+    write_manuscript(path, parse_size(manuscript_size))
+    return path
+
+@pytest.fixture
+def manuscript_copy(manuscript, tmp_path):
+    """Private copy of `manuscript` for benchmarks that append to it."""
+    path = tmp_path / manuscript.name
+    shutil.copyfile(manuscript, path)
+    return path
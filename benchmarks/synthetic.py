@@ -0,0 +1,26 @@
+"""Synthetic manuscripts for the benchmarks."""
+import random
+
+WORDS = ("the quick brown fox jumps over a lazy dog while rain falls softly "
+         "on distant hills and old stories wait to be written").split()
+
+def parse_size(text):
+    """Parse sizes such as '512K', '100M' or '1G' into bytes."""
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def write_manuscript(path, size):
+    """Write roughly `size` bytes of one-sentence-per-line text."""
+    rng = random.Random(size)
+    lines = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 20))) + '.\n'
+             for _ in range(1000)]
+    block = ''.join(lines).encode('utf-8')
+    with open(path, 'wb') as f:
+        written = 0
+        while written < size:
+            f.write(block[:size - written])
+            written += len(block)
+        f.write(b'The last sentence.\n')
@@ -0,0 +1,44 @@
+"""Exact Markdown written for lines that would otherwise start a block."""
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from bashout_export import write_markdown
+
+def markdown(*lines):
+    events = []
+    for line in lines:
+        events += [('paragraph', None), ('text', line)]
+    out = io.StringIO()
+    write_markdown(events, out, "Book")
+    return out.getvalue()
+
+@pytest.mark.parametrize('line, expected', [
+    ("1. The first thing.", "1\\. The first thing."),
+    ("12) A dozen reasons.", "12\\) A dozen reasons."),
+    ("- A dash of doubt.", "\\- A dash of doubt."),
+    ("+ Plus one more.", "\\+ Plus one more."),
+    ("* Starred.", "\\* Starred."),
+    ("# Not a heading.", "\\# Not a heading."),
+    ("> Not a quote.", "\\> Not a quote."),
+    ("1984 was a year.", "1984 was a year."),
+    ("-30 degrees outside.", "-30 degrees outside."),
+])
+def test_block_starts(line, expected):
+    assert markdown(line) == f"# Book\n\n{expected}\n"
+
+def test_only_paragraph_starts_are_escaped():
+    events = [('paragraph', None), ('text', "Counting down:"), ('text', "3. 2. 1.")]
+    out = io.StringIO()
+    write_markdown(events, out, "Book")
+    assert out.getvalue() == "# Book\n\nCounting down: 3. 2. 1.\n"
+
+def test_titles_are_escaped():
+    events = [('chapter', "Part #1: *the* [draft] <v2> ##"), ('paragraph', None), ('text', "Text.")]
+    out = io.StringIO()
+    write_markdown(events, out, "my_book")
+    assert out.getvalue() == ("# my\\_book\n\n"
+                              "## Part \\#1: \\*the\\* \\[draft\\] \\<v2\\> \\#\\#\n\nText.\n")